@@ -1,13 +1,18 @@
 import os
 import logging
+from datetime import date
+from decimal import Decimal
+import orjson
 from flask import Flask
+from flask.json.provider import JSONProvider
+from werkzeug.routing import BaseConverter, ValidationError
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
 from sqlalchemy.orm import DeclarativeBase
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (set LOG_LEVEL=INFO in production to skip debug output)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "DEBUG").upper())
 
 # Create base class for SQLAlchemy models
 class Base(DeclarativeBase):
@@ -18,8 +23,41 @@ db = SQLAlchemy(model_class=Base)
 login_manager = LoginManager()
 mail = Mail()
 
+class ISODateConverter(BaseConverter):
+    """URL converter for YYYY-MM-DD dates"""
+    regex = r'\d{4}-\d{2}-\d{2}'
+
+    def to_python(self, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError()
+
+    def to_url(self, value):
+        return value.isoformat()
+
+def _orjson_default(obj):
+    """Serialize the types orjson does not handle natively, as Flask's default provider does"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson for faster jsonify/tojson serialization"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default,
+                            option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Create the app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.url_map.converters['isodate'] = ISODateConverter
 app.config['FLASK_APP'] = 'main.py'
 app.secret_key = os.environ.get("SESSION_SECRET", "temporary_secret_key_for_development")
 
@@ -66,7 +104,7 @@ with app.app_context():
     # Setup user loader for Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        user = models.User.query.get(int(user_id))
+        user = db.session.get(models.User, int(user_id))
         # Return None for inactive users to automatically log them out
         if user and not user.active:
             return None
@@ -0,0 +1,80 @@
+"""Simple in-process cache with per-entry expiry and a size bound.
+
+Each process has its own cache. The app is deployed on Replit autoscale, which
+can run several instances (each a single gunicorn worker), and cache_delete and
+cache_pop only clear the local process. Other instances keep serving their copy
+until it expires, so entries use short ttls (a few minutes by default) and must
+be safe to serve that stale. Counters such as the login lockout are likewise
+kept per instance.
+
+Some keys come from user input (login attempts per email, approval lookups per
+week), so the cache is capped: once it holds _CACHE_MAX_ENTRIES entries, the
+least recently used ones are evicted first. Expired entries are also dropped
+whenever they are read.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_CACHE_MAX_ENTRIES = 10000
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _store(key, entry):
+    """Insert or replace an entry as most recently used, evicting past the bound.
+    Callers hold _cache_lock."""
+    _cache[key] = entry
+    _cache.move_to_end(key)
+    while len(_cache) > _CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def cache_get(key):
+    """Return a cached value, or None if missing or expired"""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            _cache.pop(key, None)
+            return None
+        _cache.move_to_end(key)
+        return value
+
+
+def cache_set(key, value, ttl=300):
+    """Store a value in the cache for ttl seconds"""
+    with _cache_lock:
+        _store(key, (time.monotonic() + ttl, value))
+
+
+def cache_delete(prefix):
+    """Drop every cached value whose key starts with prefix"""
+    with _cache_lock:
+        for key in [k for k in _cache if k.startswith(prefix)]:
+            _cache.pop(key, None)
+
+
+def cache_pop(key):
+    """Drop a single cached value"""
+    with _cache_lock:
+        _cache.pop(key, None)
+
+
+def cache_incr(key, ttl=300):
+    """Increment a cached counter and return the new count.
+
+    A missing or expired counter starts at 1 with a fresh ttl window; later
+    increments keep the original expiry.
+    """
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            _store(key, (time.monotonic() + ttl, 1))
+            return 1
+        expires_at, count = entry
+        _store(key, (expires_at, count + 1))
+        return count + 1
@@ -6,6 +6,10 @@ from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationE
 from models import User, Job, LaborActivity
 from datetime import date, timedelta
 
+def normalize_email(value):
+    """Field filter that trims and lowercases email addresses"""
+    return value.strip().lower() if value else value
+
 # Custom FloatField that properly handles empty inputs
 class FloatField(BaseFloatField):
     """
@@ -61,7 +65,7 @@ class FlaskForm(BaseFlaskForm):
 
 class LoginForm(FlaskForm):
     """Form for user login"""
-    email = StringField('Email', validators=[DataRequired(), Email()])
+    email = StringField('Email', filters=[normalize_email], validators=[DataRequired(), Email()])
     password = PasswordField('Password', validators=[DataRequired()])
     submit = SubmitField('Login')
 
@@ -209,7 +213,7 @@ class LaborActivityForm(FlaskForm):
 class UserManagementForm(FlaskForm):
     """Form for admin to edit users"""
     name = StringField('Full Name', validators=[DataRequired(), Length(min=2, max=100)])
-    email = StringField('Email', validators=[DataRequired(), Email()])
+    email = StringField('Email', filters=[normalize_email], validators=[DataRequired(), Email()])
     role = SelectField('Role', choices=[
         ('worker', 'Field Worker'),
         ('foreman', 'Foreman'),
@@ -226,9 +230,15 @@ class UserManagementForm(FlaskForm):
     submit = SubmitField('Update User')
     
     def __init__(self, *args, **kwargs):
+        # New users must be given a password; edits may leave it blank
+        is_new_user = kwargs.pop('is_new_user', False)
+        
         super(UserManagementForm, self).__init__(*args, **kwargs)
         from models import Trade
         
+        if is_new_user:
+            self.password.validators = [DataRequired(message='Password is required for new users')]
+        
         # Populate trades choices for qualified trades
         trades = Trade.query.filter_by(is_active=True).all()
         self.qualified_trades.choices = [(t.id, t.name) for t in trades]
@@ -452,7 +462,7 @@ class GPSComplianceReportForm(FlaskForm):
 
 class ForgotPasswordForm(FlaskForm):
     """Form for requesting a password reset"""
-    email = StringField('Email', validators=[DataRequired(), Email()])
+    email = StringField('Email', filters=[normalize_email], validators=[DataRequired(), Email()])
     submit = SubmitField('Send Reset Link')
 
 
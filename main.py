@@ -1,5 +1,5 @@
 from app import app
-from scheduler import init_scheduler
+from scheduler import init_scheduler, flush_device_logs_job
 import atexit
 
 # Initialize the scheduler
@@ -8,5 +8,8 @@ scheduler = init_scheduler()
 # Register a function to shut down the scheduler when exiting
 atexit.register(lambda: scheduler.shutdown(wait=False))
 
+# Write any device logs still queued (atexit runs this before the shutdown above)
+atexit.register(flush_device_logs_job)
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,25 @@
+"""Add partial index on active jobs
+
+Revision ID: add_job_active_index
+Revises: add_user_job_and_clock_session_indexes
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_job_active_index'
+down_revision = 'add_user_job_and_clock_session_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Dashboards and job pickers filter on status = 'active'
+    op.execute("CREATE INDEX IF NOT EXISTS ix_job_active ON job (id) WHERE status = 'active'")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_job_active")
@@ -0,0 +1,30 @@
+"""Cover dashboard hour sums with time entry indexes
+
+Revision ID: add_time_entry_covering_indexes
+Revises: add_job_active_index
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_time_entry_covering_indexes'
+down_revision = 'add_job_active_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The admin dashboard sums hours over a date range grouped by job and by labor activity.
+    # INCLUDE (hours) lets those sums run as index-only scans without heap fetches.
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_date_job")
+    op.execute("CREATE INDEX ix_time_entry_date_job ON time_entry (date, job_id) INCLUDE (hours)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entry_date_activity ON time_entry (date, labor_activity_id) INCLUDE (hours)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_date_activity")
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_date_job")
+    op.execute("CREATE INDEX ix_time_entry_date_job ON time_entry (date, job_id)")
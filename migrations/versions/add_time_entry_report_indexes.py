@@ -0,0 +1,30 @@
+"""Add time entry indexes for report filters
+
+Revision ID: add_time_entry_report_indexes
+Revises: 59a85bf33c87
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_time_entry_report_indexes'
+down_revision = '59a85bf33c87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reports filter time entries on a date range, optionally narrowed by worker or job.
+    # IF NOT EXISTS keeps this safe on databases where db.create_all() already built them.
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entry_date_user ON time_entry (date, user_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entry_date_job ON time_entry (date, job_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entry_user_date ON time_entry (user_id, date)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_user_date")
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_date_job")
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_date_user")
@@ -0,0 +1,26 @@
+"""Add functional index on lower(email) for user lookups
+
+Revision ID: add_user_email_lower_index
+Revises: ensure_unique_time_entry
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_email_lower_index'
+down_revision = 'ensure_unique_time_entry'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Login and password reset match on lower(email) so older mixed-case addresses still resolve.
+    # Not unique: existing rows may differ only by case, and email keeps its own unique constraint.
+    op.execute('CREATE INDEX IF NOT EXISTS ix_user_email_lower ON "user" (lower(email))')
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_user_email_lower")
@@ -0,0 +1,28 @@
+"""Add per-worker job and clock session indexes
+
+Revision ID: add_user_job_and_clock_session_indexes
+Revises: add_user_email_lower_index
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_job_and_clock_session_indexes'
+down_revision = 'add_user_email_lower_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Foreman entry and approval pages read one worker's week on one job.
+    # The clock screen reads a worker's sessions ordered and ranged by clock_in.
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entry_user_job_date ON time_entry (user_id, job_id, date)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_clock_session_user_clock_in ON clock_session (user_id, clock_in)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_clock_session_user_clock_in")
+    op.execute("DROP INDEX IF EXISTS ix_time_entry_user_job_date")
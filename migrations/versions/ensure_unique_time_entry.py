@@ -0,0 +1,38 @@
+"""Ensure the unique time entry constraint exists
+
+Revision ID: ensure_unique_time_entry
+Revises: add_time_entry_report_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ensure_unique_time_entry'
+down_revision = 'add_time_entry_report_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The weekly timesheet upserts with ON CONFLICT on this constraint, and its backing
+    # index also serves the (user_id, job_id, labor_activity_id, date) lookups.
+    # Tables built by db.create_all() already have it, so only add it when missing.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_time_entry') THEN
+                ALTER TABLE time_entry
+                ADD CONSTRAINT unique_time_entry UNIQUE (user_id, job_id, labor_activity_id, date);
+            END IF;
+        END $$;
+        """
+    )
+
+
+def downgrade():
+    # The constraint is part of the model definition, so leave it in place
+    pass
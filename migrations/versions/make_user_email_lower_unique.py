@@ -0,0 +1,37 @@
+"""Make the lower(email) index unique
+
+Revision ID: make_user_email_lower_unique
+Revises: add_time_entry_covering_indexes
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'make_user_email_lower_unique'
+down_revision = 'add_time_entry_covering_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Login, password reset and passkey sign-in match on lower(email), so two users whose
+    # emails differ only by case make those lookups ambiguous. Refuse to continue until
+    # such accounts have been merged or renamed, then enforce it with the index.
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT lower(email) FROM "user" GROUP BY lower(email) HAVING count(*) > 1'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            'Users with emails that differ only by case must be merged or renamed before '
+            'upgrading: ' + ', '.join(duplicates))
+
+    op.execute("DROP INDEX IF EXISTS ix_user_email_lower")
+    op.execute('CREATE UNIQUE INDEX ix_user_email_lower ON "user" (lower(email))')
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_user_email_lower")
+    op.execute('CREATE INDEX ix_user_email_lower ON "user" (lower(email))')
@@ -1,6 +1,7 @@
 from app import db
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import generate_password_hash, check_password_hash
 
 # Association table for many-to-many relationship between Job and User (worker)
@@ -35,6 +36,12 @@ class User(UserMixin, db.Model):
     burden_rate = db.Column(db.Numeric(10, 2), nullable=True)  # Hourly burden rate for job costing ($/hour)
     active = db.Column(db.Boolean, default=True)  # Whether the employee is active/inactive
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Case-insensitive lookups for login, password reset and passkey sign-in;
+        # unique so two accounts cannot differ only by email case
+        db.Index('ix_user_email_lower', db.func.lower(email), unique=True),
+    )
     
     # Relationships
     time_entries = db.relationship('TimeEntry', foreign_keys='TimeEntry.user_id', backref='user', lazy='dynamic')
@@ -98,6 +105,11 @@ class Job(db.Model):
                            secondary=job_trades,
                            backref=db.backref('jobs', lazy='dynamic'),
                            lazy='dynamic')
+
+    __table_args__ = (
+        # Most pages list only active jobs; a partial index keeps that lookup small
+        db.Index('ix_job_active', 'id', postgresql_where=db.text("status = 'active'")),
+    )
     
     def __repr__(self):
         return f'<Job {self.job_code}>'
@@ -136,6 +148,14 @@ class TimeEntry(db.Model):
     __table_args__ = (
         db.UniqueConstraint('user_id', 'job_id', 'labor_activity_id', 'date', name='unique_time_entry'),
         db.CheckConstraint('hours BETWEEN 0 AND 24', name='check_hours_range'),
+        # Indexes for report date-range scans with optional worker/job filters
+        db.Index('ix_time_entry_date_user', 'date', 'user_id'),
+        db.Index('ix_time_entry_date_job', 'date', 'job_id', postgresql_include=['hours']),
+        db.Index('ix_time_entry_user_date', 'user_id', 'date'),
+        # Dashboard hours by trade; carrying hours lets the SUMs run as index-only scans
+        db.Index('ix_time_entry_date_activity', 'date', 'labor_activity_id', postgresql_include=['hours']),
+        # Per-worker, per-job week lookups (foreman entry, approval, duplicate cleanup)
+        db.Index('ix_time_entry_user_job_date', 'user_id', 'job_id', 'date'),
     )
     
     # Relationships
@@ -186,6 +206,11 @@ class ClockSession(db.Model):
     clock_out_longitude = db.Column(db.Float, nullable=True)
     clock_out_accuracy = db.Column(db.Float, nullable=True)  # Accuracy in meters
     clock_out_distance_mi = db.Column(db.Float, nullable=True)  # Distance from job site in miles
+
+    __table_args__ = (
+        # A worker's sessions by clock-in time (clock screen, today's and recent sessions)
+        db.Index('ix_clock_session_user_clock_in', 'user_id', 'clock_in'),
+    )
     
     # Relationships
     job = db.relationship('Job', backref='clock_sessions', lazy='joined')
@@ -196,17 +221,26 @@ class ClockSession(db.Model):
         self.clock_out = datetime.utcnow()
         self.is_active = False
     
+    @hybrid_property
+    def duration_hours(self):
+        """Hours between clock in and clock out (0 while still clocked in).
+        Usable in queries too, e.g. func.sum(ClockSession.duration_hours)."""
+        if not self.clock_out:
+            return 0
+        return (self.clock_out - self.clock_in).total_seconds() / 3600
+
+    @duration_hours.expression
+    def duration_hours(cls):
+        # NULL for open sessions, which SUM() skips
+        return db.func.extract('epoch', cls.clock_out - cls.clock_in) / 3600.0
+
     def get_duration_hours(self):
         """Get the duration of the session in hours"""
         if not self.clock_out:
             # If still clocked in, calculate against current time
-            end_time = datetime.utcnow()
+            hours = (datetime.utcnow() - self.clock_in).total_seconds() / 3600
         else:
-            end_time = self.clock_out
-            
-        delta = end_time - self.clock_in
-        # Convert timedelta to hours (as a float)
-        hours = delta.total_seconds() / 3600
+            hours = self.duration_hours
         return round(hours, 2)  # Round to 2 decimal places
     
     def create_time_entry(self):
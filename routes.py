@@ -1,26 +1,31 @@
-import os
 import csv
 import io
 from io import BytesIO
 import base64
-from datetime import datetime, timedelta, date
-from functools import wraps
-from flask import render_template, redirect, url_for, flash, request, jsonify, send_file, session, abort
+import math
+from collections import OrderedDict
+from datetime import datetime, timedelta, date, time
+from decimal import Decimal
+from functools import lru_cache, wraps
+from itertools import groupby
+from operator import attrgetter
+from flask import render_template, redirect, url_for, flash, request, jsonify, send_file, session, abort, Response
 from flask_login import login_user, logout_user, current_user, login_required
 from app import app, db
-from models import User, Job, LaborActivity, TimeEntry, WeeklyApprovalLock, ClockSession, Trade, job_workers, DeviceLog, PasswordResetToken, ForemanReviewedTime, SystemMessage, PasskeyCredential
-from sqlalchemy import func
+from models import User, Job, LaborActivity, TimeEntry, WeeklyApprovalLock, ClockSession, Trade, job_workers, user_trades, DeviceLog, PasswordResetToken, ForemanReviewedTime, SystemMessage, PasskeyCredential
+from sqlalchemy import exists, func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import load_only
 from zoneinfo import ZoneInfo
 from forms import (LoginForm, TimeEntryForm, ApprovalForm,
                    JobForm, LaborActivityForm, UserManagementForm, ReportForm,
                    WeeklyTimesheetForm, ClockInForm, ClockOutForm, TradeForm,
                    JobWorkersForm, GPSComplianceReportForm, ForgotPasswordForm, ResetPasswordForm)
-from werkzeug.security import generate_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash
 from flask_mail import Message
 from app import mail
 import secrets
-import pandas as pd
 import utils
 import json
 from webauthn import (
@@ -41,6 +46,11 @@ from webauthn.helpers.structs import (
 )
 from webauthn.helpers import bytes_to_base64url, base64url_to_bytes
 
+# User-facing dates and times are shown in Pacific time (handles PST/PDT)
+PACIFIC_TZ = ZoneInfo('America/Los_Angeles')
+
+# Day names by weekday index (Monday = 0), matching the weekly timesheet rows
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
 
 # Context processor to provide the current datetime to all templates
 @app.context_processor
@@ -97,16 +107,59 @@ def get_week_range_for_offset(week_offset=0):
     Returns:
         Tuple of (start_date, end_date) as date objects representing Monday and Sunday of the week
     """
-    today = datetime.today().date()
-    print(f"DEBUG: Today's date is {today}")
-    base_monday = today - timedelta(days=today.weekday())
-    print(f"DEBUG: Base Monday for current week is {base_monday}")
-    start = base_monday + timedelta(weeks=week_offset)
+    # "Current week" follows the Pacific calendar, not the server's UTC clock
+    today = datetime.now(PACIFIC_TZ).date()
+    start = get_week_start(today) + timedelta(weeks=week_offset)
     end = start + timedelta(days=6)
-    print(f"DEBUG: Week range with offset {week_offset} is {start} to {end}")
     return start, end
 
 
+@lru_cache(maxsize=256)
+def parse_flexible_date(value):
+    """
+    Parses a query-string date in %m/%d/%Y or %Y-%m-%d format.
+
+    Returns:
+        A date, or None if the value is empty or not a valid date
+    """
+    if not value:
+        return None
+    # Split the two fixed numeric formats directly rather than going through strptime
+    try:
+        if '/' in value:
+            month, day, year = value.split('/')
+        else:
+            year, month, day = value.split('-')
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def get_week_range_from_request():
+    """
+    Returns the week requested by the start_date / week_offset query arguments.
+
+    A start_date in %m/%d/%Y or %Y-%m-%d format is aligned to its Monday. Without
+    a valid start_date, week_offset (default 0) is applied to the current week.
+
+    Returns:
+        Tuple of (start_date, end_date, week_offset)
+    """
+    week_offset = request.args.get('week_offset', 0, type=int)
+    start_date_str = request.args.get('start_date')
+
+    if start_date_str:
+        parsed_date = parse_flexible_date(start_date_str)
+        if parsed_date:
+            monday_date = get_week_start(parsed_date)
+            return monday_date, monday_date + timedelta(days=6), week_offset
+        app.logger.warning("Invalid start_date %r, falling back to week offset %s",
+                           start_date_str, week_offset)
+
+    start_date, end_date = get_week_range_for_offset(week_offset)
+    return start_date, end_date, week_offset
+
+
 # Custom decorators for role-based access control
 def worker_required(f):
 
@@ -156,6 +209,11 @@ def foreman_or_admin_required(f):
     return decorated_function
 
 
+# Failed password logins allowed per email before further attempts are refused
+LOGIN_MAX_FAILURES = 5
+LOGIN_LOCKOUT_SECONDS = 900
+
+
 # Authentication routes
 @app.route('/', methods=['GET', 'POST'])
 @app.route('/login', methods=['GET', 'POST'])
@@ -169,14 +227,11 @@ def login():
         
         # Add debug logging for use_clock_in state
         if current_user.is_worker():
-            print(
-                f"DEBUG: Worker {current_user.name} (ID: {current_user.id}) logged in with use_clock_in = {current_user.use_clock_in}"
-            )
+            app.logger.debug("Worker %s (ID: %s) logged in with use_clock_in = %s",
+                             current_user.name, current_user.id, current_user.use_clock_in)
             if current_user.use_clock_in:
-                print(f"DEBUG: Redirecting worker to clock in/out screen")
                 return redirect(url_for('worker_clock'))
             else:
-                print(f"DEBUG: Redirecting worker to timesheet screen")
                 return redirect(url_for('worker_timesheet'))
         elif current_user.is_foreman():
             return redirect(url_for('foreman_dashboard'))
@@ -184,14 +239,24 @@ def login():
             return redirect(url_for('admin_dashboard'))
 
     form = LoginForm()
-    if form.validate_on_submit():
-        email = form.email.data.lower() if form.email.data else ''
-        user = User.query.filter_by(email=email).first()
+    # Validate once and reuse the result below
+    is_valid = form.validate_on_submit()
+    if is_valid:
+        email = form.email.data or ''
+
+        # Refuse repeated failures without touching the database or hashing
+        fail_key = f'login:fail:{email}'
+        if (utils.cache_get(fail_key) or 0) >= LOGIN_MAX_FAILURES:
+            flash('Too many failed login attempts. Please try again in 15 minutes.', 'danger')
+            return render_template('login.html', form=form)
+
+        user = User.query.filter(func.lower(User.email) == email).first()
         if user and user.check_password(form.password.data):
             # Check if user is active
             if not user.active:
                 flash('Your account has been deactivated. Please contact your administrator.', 'danger')
                 return render_template('login.html', form=form)
+            utils.cache_pop(fail_key)
             login_user(user)
             next_page = request.args.get('next')
 
@@ -199,29 +264,23 @@ def login():
                 return redirect(next_page)
             elif user.is_worker():
                 # Add debug logging for post-login redirect
-                print(
-                    f"DEBUG: Post-login for worker {user.name} (ID: {user.id}) with use_clock_in = {user.use_clock_in}"
-                )
+                app.logger.debug("Post-login for worker %s (ID: %s) with use_clock_in = %s",
+                                 user.name, user.id, user.use_clock_in)
                 if user.use_clock_in:
-                    print(
-                        f"DEBUG: Redirecting worker to clock in/out screen (post-login)"
-                    )
                     return redirect(url_for('worker_clock'))
                 else:
-                    print(
-                        f"DEBUG: Redirecting worker to timesheet screen (post-login)"
-                    )
                     return redirect(url_for('worker_timesheet'))
             elif user.is_foreman():
                 return redirect(url_for('foreman_dashboard'))
             else:
                 return redirect(url_for('admin_dashboard'))
         else:
+            utils.cache_incr(fail_key, ttl=LOGIN_LOCKOUT_SECONDS)
             flash('Incorrect Email or Password. Please try again.',
                   'danger')
 
     # Ensure that errors are displayed if the form is submitted but invalid
-    if request.method == 'POST' and not form.validate():
+    if request.method == 'POST' and not is_valid:
         flash('Please check your input and try again.', 'warning')
     return render_template('login.html', form=form)
 
@@ -234,8 +293,8 @@ def forgot_password():
     
     form = ForgotPasswordForm()
     if form.validate_on_submit():
-        email = form.email.data.lower() if form.email.data else ''
-        user = User.query.filter_by(email=email).first()
+        email = form.email.data or ''
+        user = User.query.filter(func.lower(User.email) == email).first()
         
         # Always show success message (don't reveal if email exists)
         flash('If that email address is registered, we have sent a password reset link.', 'info')
@@ -288,9 +347,9 @@ BuilderTime Pro
 <p>Best regards,<br>BuilderTime Pro</p>
 '''
                 mail.send(msg)
-                print(f"DEBUG: Password reset email sent to {user.email}")
+                app.logger.debug("Password reset email sent to %s", user.email)
             except Exception as e:
-                print(f"ERROR: Failed to send password reset email: {e}")
+                app.logger.error("Failed to send password reset email: %s", e)
                 # Don't expose email errors to user
         
         return redirect(url_for('login'))
@@ -305,8 +364,6 @@ def reset_password(token):
         return redirect(url_for('login'))
     
     # Find valid token by checking all tokens (we need to verify the hash)
-    from werkzeug.security import check_password_hash
-    
     # Get all unused tokens and check each one
     valid_token_record = None
     all_tokens = PasswordResetToken.query.filter_by(used_at=None).all()
@@ -343,6 +400,17 @@ def logout():
 
 
 # Worker routes
+def _unused_relations_load(loader=db):
+    """Loader option for relationships a query doesn't eager-load.
+
+    Skips the lazy='joined' defaults (approver, foreman, trade) the worker
+    pages never read. In debug mode, any remaining lazy access raises so
+    new N+1 queries show up during development. Pass a joinedload() to
+    apply the same rule to the related object.
+    """
+    return loader.raiseload('*') if app.debug else loader.lazyload('*')
+
+
 @app.route('/worker/weekly', methods=['GET', 'POST'])
 @login_required
 @worker_required
@@ -355,37 +423,35 @@ def worker_weekly_timesheet():
             'Weekly timesheet view is currently unavailable for manual time entry. Please use the daily view.',
             'info')
         return redirect(url_for('worker_timesheet'))
-    print("DEBUG: Weekly timesheet form submission - Request method:",
-          request.method)
-    print("DEBUG: Form data:", request.form)
+    app.logger.debug("Weekly timesheet request method: %s", request.method)
 
     form = WeeklyTimesheetForm(current_user=current_user)
 
     # Check if we're loading a specific job's labor activities
-    job_id = request.args.get('job_id')
+    job_id = request.args.get('job_id', type=int)
     if job_id:
-        job = Job.query.get_or_404(job_id)
+        # A job's trade type rarely changes - cache it under the job_trades: key that
+        # the job admin routes already clear, so only the first view loads the job
+        cache_key = f'job_trades:{job_id}:trade_type'
+        cached = utils.cache_get(cache_key)
+        if cached is None:
+            job = db.session.get(Job, job_id)
+            if not job:
+                abort(404)
+            cached = (job.trade_type,)
+            utils.cache_set(cache_key, cached)
         # Populate labor activities for this job's trade type
-        form.labor_activity_id.choices = [
-            (activity.id, activity.name)
-            for activity in LaborActivity.query.filter_by(
-                trade_category=job.trade_type).all()
-        ]
+        form.labor_activity_id.choices = utils.labor_activity_choices(cached[0])
     else:
-        # Default empty list or all activities if no job selected
-        form.labor_activity_id.choices = [
-            (activity.id, activity.name)
-            for activity in LaborActivity.query.all()
-        ]
+        # Default to all activities if no job selected
+        form.labor_activity_id.choices = utils.labor_activity_choices()
 
     # Default to current week if no week start provided
     if not form.week_start.data:
         today = date.today()
         # Always use this formula for current week start (Monday)
         form.week_start.data = today - timedelta(days=today.weekday())
-        print(
-            f"DEBUG: Setting current week start to: {form.week_start.data} (Today is {today})"
-        )
+        app.logger.debug("Defaulting week start to %s (today is %s)", form.week_start.data, today)
 
     week_start = form.week_start.data
     week_end = week_start + timedelta(days=6)
@@ -399,16 +465,12 @@ def worker_weekly_timesheet():
                     ('saturday', form.saturday_hours),
                     ('sunday', form.sunday_hours)]
 
-    # Debug the validation process
-    if request.method == 'POST':
-        print("DEBUG: Validating form...")
-        is_valid = form.validate()
-        print(f"DEBUG: Form validation result: {is_valid}")
-        if not is_valid:
-            print("DEBUG: Form errors:", form.errors)
+    # Validate once and reuse the result below
+    is_valid = form.validate_on_submit()
+    if request.method == 'POST' and not is_valid:
+        app.logger.debug("Weekly timesheet form errors: %s", form.errors)
 
-    if form.validate_on_submit():
-        print("DEBUG: Form validated successfully, proceeding with submission")
+    if is_valid:
         
         # Get job for validation
         job = Job.query.get(form.job_id.data)
@@ -440,10 +502,7 @@ def worker_weekly_timesheet():
                 return redirect(url_for('worker_weekly_timesheet'))
         
         # Check if any timesheet for this week is already approved/locked
-        is_locked = WeeklyApprovalLock.query.filter_by(
-            user_id=current_user.id,
-            job_id=form.job_id.data,
-            week_start=week_start).first()
+        is_locked = utils.is_timesheet_approved(current_user.id, form.job_id.data, week_start)
 
         if is_locked:
             flash(
@@ -451,6 +510,22 @@ def worker_weekly_timesheet():
                 'danger')
             return redirect(url_for('worker_weekly_timesheet'))
 
+        # Load this week's existing hours per day in two grouped queries:
+        # across ALL jobs/activities, and for the job/activity being saved
+        daily_totals = dict(db.session.query(
+            TimeEntry.date, db.func.sum(TimeEntry.hours)).filter(
+                TimeEntry.user_id == current_user.id,
+                TimeEntry.date >= week_start,
+                TimeEntry.date <= week_end).group_by(TimeEntry.date).all())
+        same_activity_totals = dict(db.session.query(
+            TimeEntry.date, db.func.sum(TimeEntry.hours)).filter(
+                TimeEntry.user_id == current_user.id,
+                TimeEntry.date >= week_start,
+                TimeEntry.date <= week_end,
+                TimeEntry.job_id == form.job_id.data,
+                TimeEntry.labor_activity_id == form.labor_activity_id.data).group_by(
+                    TimeEntry.date).all())
+
         # Check maximum 12 hours per day limit
         for i, (day_name, hours_field) in enumerate(days_of_week):
             # Calculate the date for this day
@@ -459,21 +534,9 @@ def worker_weekly_timesheet():
             # Get hours from current form
             current_hours = hours_field.data or 0
 
-            # Get existing hours for this day from ALL jobs/activities
-            # to properly enforce 12-hour daily maximum
-            existing_hours = db.session.query(db.func.sum(
-                TimeEntry.hours)).filter(
-                    TimeEntry.user_id == current_user.id, 
-                    TimeEntry.date == entry_date).scalar() or 0
-            
-            # Subtract hours from current job/activity to avoid double-counting when editing
-            current_job_activity_hours = db.session.query(db.func.sum(
-                TimeEntry.hours)).filter(
-                    TimeEntry.user_id == current_user.id,
-                    TimeEntry.date == entry_date,
-                    TimeEntry.job_id == form.job_id.data,
-                    TimeEntry.labor_activity_id == form.labor_activity_id.data).scalar() or 0
-            existing_hours -= current_job_activity_hours
+            # Existing hours for this day from ALL jobs/activities, minus the
+            # current job/activity to avoid double-counting when editing
+            existing_hours = daily_totals.get(entry_date, 0) - same_activity_totals.get(entry_date, 0)
 
             total_hours = existing_hours + current_hours
 
@@ -485,25 +548,8 @@ def worker_weekly_timesheet():
                 return redirect(url_for('worker_weekly_timesheet'))
 
         # Check maximum 60 hours per week limit
-        week_start_date = week_start
-        week_end_date = week_start + timedelta(days=6)
-        
-        # Get existing weekly hours across all jobs
-        existing_weekly_hours = db.session.query(db.func.sum(TimeEntry.hours)).filter(
-            TimeEntry.user_id == current_user.id,
-            TimeEntry.date >= week_start_date,
-            TimeEntry.date <= week_end_date
-        ).scalar() or 0
-        
-        # Subtract current job/activity hours to avoid double-counting when editing
-        current_job_weekly_hours = db.session.query(db.func.sum(TimeEntry.hours)).filter(
-            TimeEntry.user_id == current_user.id,
-            TimeEntry.date >= week_start_date,
-            TimeEntry.date <= week_end_date,
-            TimeEntry.job_id == form.job_id.data,
-            TimeEntry.labor_activity_id == form.labor_activity_id.data
-        ).scalar() or 0
-        existing_weekly_hours -= current_job_weekly_hours
+        # Existing weekly hours across all jobs, minus the current job/activity
+        existing_weekly_hours = sum(daily_totals.values()) - sum(same_activity_totals.values())
         
         # Calculate new weekly total from form
         new_weekly_hours = form.get_total_hours()
@@ -515,37 +561,42 @@ def worker_weekly_timesheet():
                 'danger')
             return redirect(url_for('worker_weekly_timesheet'))
 
-        # First, delete any existing entries for this week with the same activity
-        # This ensures we don't get duplicate entries if the user submits multiple times
-        TimeEntry.query.filter(
-            TimeEntry.user_id == current_user.id,
-            TimeEntry.job_id == form.job_id.data,
-            TimeEntry.labor_activity_id == form.labor_activity_id.data,
-            TimeEntry.date >= week_start, TimeEntry.date <= week_end).delete()
-
-        # Create time entries for each day of the week that has hours
-        # Note: days_of_week is already defined above
-
-        entries_created = 0
-
+        # Build one row per day that has hours; days cleared to zero are deleted
+        # With our improved FloatField, empty values are safely converted to 0.0
+        entry_rows = []
+        cleared_dates = []
         for i, (day_name, hours_field) in enumerate(days_of_week):
-            # With our improved FloatField, empty values are now safely converted to 0.0
-            # So we only need to check for positive hours to create entries
+            entry_date = week_start + timedelta(days=i)
             hours_value = hours_field.data or 0.0
             if hours_value > 0:
-                # Calculate the date for this day
-                entry_date = week_start + timedelta(days=i)
-
-                # Create new entry
-                new_entry = TimeEntry(
-                    user_id=current_user.id,
-                    job_id=form.job_id.data,
-                    labor_activity_id=form.labor_activity_id.data,
-                    date=entry_date,
-                    hours=hours_value,  # Use the safely processed value
-                    notes=form.notes.data)
-                db.session.add(new_entry)
-                entries_created += 1
+                entry_rows.append({
+                    'user_id': current_user.id,
+                    'job_id': form.job_id.data,
+                    'labor_activity_id': form.labor_activity_id.data,
+                    'date': entry_date,
+                    'hours': hours_value,
+                    'notes': form.notes.data
+                })
+            else:
+                cleared_dates.append(entry_date)
+
+        # Remove entries for days that no longer have hours
+        if cleared_dates:
+            TimeEntry.query.filter(
+                TimeEntry.user_id == current_user.id,
+                TimeEntry.job_id == form.job_id.data,
+                TimeEntry.labor_activity_id == form.labor_activity_id.data,
+                TimeEntry.date.in_(cleared_dates)).delete(synchronize_session=False)
+
+        # Insert or update the remaining days in one statement using the unique_time_entry constraint
+        if entry_rows:
+            upsert = pg_insert(TimeEntry.__table__).values(entry_rows)
+            upsert = upsert.on_conflict_do_update(
+                constraint='unique_time_entry',
+                set_={'hours': upsert.excluded.hours, 'notes': upsert.excluded.notes})
+            db.session.execute(upsert)
+
+        entries_created = len(entry_rows)
 
         db.session.commit()
 
@@ -563,176 +614,50 @@ def worker_weekly_timesheet():
 
     # Get job_id from URL parameters if provided
     if job_id and not form.job_id.data:
-        form.job_id.data = int(job_id)
+        form.job_id.data = job_id
 
     # If labor_activity_id is in the URL, use it
     labor_activity_id = request.args.get('labor_activity_id')
     if labor_activity_id:
         form.labor_activity_id.data = int(labor_activity_id)
 
-    # Check if this is a GET request or if form failed validation
-    if request.method == 'GET' or not form.validate():
-        # This is the key part - we're explicitly checking for GET requests to load existing data
-        # Reset all hours fields to 0 by default
-        form.monday_hours.data = 0.0
-        form.tuesday_hours.data = 0.0
-        form.wednesday_hours.data = 0.0
-        form.thursday_hours.data = 0.0
-        form.friday_hours.data = 0.0
-        form.saturday_hours.data = 0.0
-        form.sunday_hours.data = 0.0
-
-        # Load entries for selected job/activity (for form population)
-        if form.job_id.data and form.labor_activity_id.data:
-            print(
-                f"DEBUG: Searching for entries with job_id={form.job_id.data}, labor_activity_id={form.labor_activity_id.data}, user_id={current_user.id}"
-            )
-            print(f"DEBUG: Week range: {week_start} to {week_end}")
-
-            job_activity_entries = TimeEntry.query.filter(
-                TimeEntry.user_id == current_user.id,
-                TimeEntry.job_id == form.job_id.data,
-                TimeEntry.labor_activity_id == form.labor_activity_id.data,
-                TimeEntry.date >= week_start,
-                TimeEntry.date <= week_end).options(
-                    db.joinedload(TimeEntry.labor_activity)).all()
-
-            print(
-                f"DEBUG: Found {len(job_activity_entries)} existing entries for selected job/activity"
-            )
-
-            # If there are existing entries, populate the form
-            if job_activity_entries:
-                print(f"DEBUG: Setting form values from existing entries")
-
-                # Create a dictionary to store hours by day index
-                day_entries = {}
-                for entry in job_activity_entries:
-                    print(
-                        f"DEBUG: Entry date {entry.date}, hours {entry.hours}")
-                    day_index = (entry.date - week_start).days
-                    if 0 <= day_index <= 6:  # Make sure it's within the week
-                        day_entries[day_index] = entry.hours
-                        print(
-                            f"DEBUG: Day index {day_index} = {entry.hours} hours"
-                        )
-
-                # Map each day to the form field
-                if 0 in day_entries:
-                    form.monday_hours.data = day_entries[0]
-                if 1 in day_entries:
-                    form.tuesday_hours.data = day_entries[1]
-                if 2 in day_entries:
-                    form.wednesday_hours.data = day_entries[2]
-                if 3 in day_entries:
-                    form.thursday_hours.data = day_entries[3]
-                if 4 in day_entries:
-                    form.friday_hours.data = day_entries[4]
-                if 5 in day_entries:
-                    form.saturday_hours.data = day_entries[5]
-                if 6 in day_entries:
-                    form.sunday_hours.data = day_entries[6]
-
-                # Populate notes from any entry (they should be the same)
-                if job_activity_entries:
-                    form.notes.data = job_activity_entries[0].notes
-
-                print(
-                    f"DEBUG: Form values after population: M={form.monday_hours.data}, T={form.tuesday_hours.data}, W={form.wednesday_hours.data}, Total: {sum([form.monday_hours.data or 0, form.tuesday_hours.data or 0, form.wednesday_hours.data or 0, form.thursday_hours.data or 0, form.friday_hours.data or 0, form.saturday_hours.data or 0, form.sunday_hours.data or 0])}"
-                )
-            else:
-                print("DEBUG: No existing entries found to populate form")
-    # Handle the case where job_id is set but labor_activity_id is not
-    elif form.job_id.data and request.method == 'GET':
-        # If just job_id is set but not labor_activity_id, try to find any entries for this job
-        # to determine which labor activity to show by default
-        print(
-            f"DEBUG: Searching for any job entries with job_id={form.job_id.data}"
-        )
-        job_entries = TimeEntry.query.filter(
-            TimeEntry.user_id == current_user.id,
-            TimeEntry.job_id == form.job_id.data, TimeEntry.date >= week_start,
-            TimeEntry.date <= week_end).options(
-                db.joinedload(TimeEntry.labor_activity)).all()
-
-        print(f"DEBUG: Found {len(job_entries)} job entries")
-
-        # Set all hours fields to 0 by default
-        form.monday_hours.data = 0.0
-        form.tuesday_hours.data = 0.0
-        form.wednesday_hours.data = 0.0
-        form.thursday_hours.data = 0.0
-        form.friday_hours.data = 0.0
-        form.saturday_hours.data = 0.0
-        form.sunday_hours.data = 0.0
-
-        if job_entries:
-            # Group by labor_activity_id
-            entries_by_activity = {}
-            for entry in job_entries:
-                if entry.labor_activity_id not in entries_by_activity:
-                    entries_by_activity[entry.labor_activity_id] = []
-                entries_by_activity[entry.labor_activity_id].append(entry)
-
-            print(f"DEBUG: Grouped into {len(entries_by_activity)} activities")
-
-            # If entries exist, set the labor_activity_id to the first group and populate form
-            if entries_by_activity:
-                # Get the first activity and its entries
-                activity_id, entries = next(iter(entries_by_activity.items()))
-                form.labor_activity_id.data = activity_id
-                print(f"DEBUG: Setting labor_activity_id to {activity_id}")
-
-                # Create a dictionary to store hours by day index
-                day_entries = {}
-                for entry in entries:
-                    print(
-                        f"DEBUG: Entry date {entry.date}, hours {entry.hours}")
-                    day_index = (entry.date - week_start).days
-                    if 0 <= day_index <= 6:  # Make sure it's within the week
-                        day_entries[day_index] = entry.hours
-                        print(
-                            f"DEBUG: Day index {day_index} = {entry.hours} hours"
-                        )
-
-                # Map each day to the form field
-                if 0 in day_entries:
-                    form.monday_hours.data = day_entries[0]
-                if 1 in day_entries:
-                    form.tuesday_hours.data = day_entries[1]
-                if 2 in day_entries:
-                    form.wednesday_hours.data = day_entries[2]
-                if 3 in day_entries:
-                    form.thursday_hours.data = day_entries[3]
-                if 4 in day_entries:
-                    form.friday_hours.data = day_entries[4]
-                if 5 in day_entries:
-                    form.saturday_hours.data = day_entries[5]
-                if 6 in day_entries:
-                    form.sunday_hours.data = day_entries[6]
-
-                # Populate notes from any entry (they should be the same)
-                if entries:
-                    form.notes.data = entries[0].notes
-
-                print(
-                    f"DEBUG: Form values after population from job entries: M={form.monday_hours.data}, T={form.tuesday_hours.data}, W={form.wednesday_hours.data}, Total: {sum([form.monday_hours.data or 0, form.tuesday_hours.data or 0, form.wednesday_hours.data or 0, form.thursday_hours.data or 0, form.friday_hours.data or 0, form.saturday_hours.data or 0, form.sunday_hours.data or 0])}"
-                )
-            else:
-                print("DEBUG: No grouped activities found to populate form")
-        else:
-            print("DEBUG: No job entries found to populate form")
-
     # Get all time entries for the week regardless of job
     all_week_entries = TimeEntry.query.filter(
         TimeEntry.user_id == current_user.id, TimeEntry.date >= week_start,
         TimeEntry.date
-        <= week_end).options(db.joinedload(TimeEntry.job),
-                             db.joinedload(TimeEntry.labor_activity)).order_by(
+        <= week_end).options(
+            _unused_relations_load(db.joinedload(TimeEntry.job)),
+            _unused_relations_load(db.joinedload(TimeEntry.labor_activity)),
+            _unused_relations_load()).order_by(
                                  TimeEntry.date, TimeEntry.job_id,
                                  TimeEntry.labor_activity_id).all()
 
-    print(f"DEBUG: Found {len(all_week_entries)} total entries for the week")
+    # Check if this is a GET request or if form failed validation
+    if request.method == 'GET' or not is_valid:
+        # Group the week's hours by (job, activity) in one pass over the entries
+        week_hours = {}
+        week_notes = {}
+        for entry in all_week_entries:
+            key = (entry.job_id, entry.labor_activity_id)
+            week_hours.setdefault(key, [0.0] * 7)[(entry.date - week_start).days] = entry.hours
+            week_notes.setdefault(key, entry.notes)
+
+        selected = None
+        if form.job_id.data and form.labor_activity_id.data:
+            selected = (form.job_id.data, form.labor_activity_id.data)
+        elif form.job_id.data and request.method == 'GET':
+            # Only a job was chosen, so default to the first activity with hours on it
+            selected = next((key for key in week_hours if key[0] == form.job_id.data), None)
+            if selected:
+                form.labor_activity_id.data = selected[1]
+
+        # Populate the day fields, leaving days without entries at 0
+        for (day_name, hours_field), hours in zip(days_of_week, week_hours.get(selected, [0.0] * 7)):
+            hours_field.data = hours
+        if selected in week_notes:
+            form.notes.data = week_notes[selected]
+
+    app.logger.debug("Found %d total entries for the week", len(all_week_entries))
 
     return render_template('worker/weekly_timesheet.html',
                            form=form,
@@ -768,34 +693,23 @@ def worker_timesheet(entry_id=None):
 
         # Pre-populate the form with the entry's data if this is a GET request
         if request.method == 'GET':
-            print(f"DEBUG EDIT: Loading entry {entry_to_edit.id} - Job: {entry_to_edit.job_id}, Hours: {entry_to_edit.hours}, Activity: {entry_to_edit.labor_activity_id}")
+            app.logger.debug("Loading entry %s for edit - Job: %s, Hours: %s, Activity: %s",
+                             entry_to_edit.id, entry_to_edit.job_id, entry_to_edit.hours,
+                             entry_to_edit.labor_activity_id)
             form.job_id.data = entry_to_edit.job_id
             form.date.data = entry_to_edit.date
             form.labor_activity_1.data = entry_to_edit.labor_activity_id
             form.hours_1.data = entry_to_edit.hours
             form.notes.data = entry_to_edit.notes
-            print(f"DEBUG EDIT: Form populated - Job: {form.job_id.data}, Hours: {form.hours_1.data}, Activity: {form.labor_activity_1.data}")
     # Default date for new entries - check if user is viewing a specific week
     elif not form.date.data:
-        from datetime import timezone, timedelta
-        
         # Check if coming from history page with a specific week
-        start_date_param = request.args.get('start_date')
-        if start_date_param:
-            try:
-                # Parse the start_date parameter from history page
-                viewed_week_start = datetime.strptime(start_date_param, '%m/%d/%Y').date()
-                form.date.data = viewed_week_start  # Default to Monday of viewed week
-            except (ValueError, TypeError):
-                # Fall back to today's date if parsing fails
-                pacific_tz = timezone(timedelta(hours=-7))  # PDT is UTC-7
-                pacific_now = datetime.now(pacific_tz)
-                form.date.data = pacific_now.date()
+        viewed_week_start = parse_flexible_date(request.args.get('start_date'))
+        if viewed_week_start:
+            form.date.data = viewed_week_start  # Default to Monday of viewed week
         else:
             # Use Pacific timezone for accurate local date
-            pacific_tz = timezone(timedelta(hours=-7))  # PDT is UTC-7
-            pacific_now = datetime.now(pacific_tz)
-            form.date.data = pacific_now.date()
+            form.date.data = datetime.now(PACIFIC_TZ).date()
 
     if form.validate_on_submit():
         # Get job for validation
@@ -818,38 +732,38 @@ def worker_timesheet(entry_id=None):
         compatible_activities = utils.get_compatible_activities(current_user, job)
         compatible_activity_ids = set(activity.id for activity in compatible_activities)
         
+        # Parse the dynamic labor_activity_N / hours_N rows in a single pass
+        # With our improved FloatField, the first row comes straight from the form
+        extra_rows = []
+        for key, activity_id in request.form.items():
+            if key.startswith('labor_activity_') and key != 'labor_activity_1':
+                index = key.split('_')[-1]
+                hours = request.form.get(f'hours_{index}')
+                hours_value = float(hours) if hours and hours.strip() else 0.0
+                activity_id = activity_id.strip()
+                extra_rows.append((int(activity_id) if activity_id.isdigit() else None, hours_value))
+        first_hours = form.hours_1.data or 0.0
+
         # Validate ALL labor activities (including dynamic ones)
         all_activity_fields = []
-        
-        # Check the primary activity field
         if form.labor_activity_1.data:
             all_activity_fields.append(form.labor_activity_1.data)
-        
-        # Check all dynamic labor_activity_* fields in the form
-        for key in request.form.keys():
-            if key.startswith('labor_activity_') and key != 'labor_activity_1':
-                activity_id = request.form.get(key)
-                if activity_id and activity_id.strip() and activity_id.isdigit():
-                    all_activity_fields.append(int(activity_id))
-        
-        # Validate each activity
+        all_activity_fields.extend(activity_id for activity_id, _ in extra_rows if activity_id)
+
+        # Validate each activity. Compatible activities are all active, so the
+        # activity row is only looked up to pick the error message for a bad one.
         for activity_id in all_activity_fields:
-            if activity_id:
-                labor_activity = LaborActivity.query.get(activity_id)
+            if activity_id and activity_id not in compatible_activity_ids:
+                labor_activity = db.session.get(LaborActivity, activity_id)
                 if not labor_activity or not labor_activity.is_active:
                     flash('One or more selected work activities are not available.', 'danger')
-                    return redirect(url_for('worker_timesheet'))
-                
-                if labor_activity.id not in compatible_activity_ids:
+                else:
                     flash('One or more selected work activities are not available for this job and your qualifications.', 'danger')
-                    return redirect(url_for('worker_timesheet'))
+                return redirect(url_for('worker_timesheet'))
         
         # Check if timesheet for this date is already approved/locked
         week_start = get_week_start(form.date.data)
-        is_locked = WeeklyApprovalLock.query.filter_by(
-            user_id=current_user.id,
-            job_id=form.job_id.data,
-            week_start=week_start).first()
+        is_locked = utils.is_timesheet_approved(current_user.id, form.job_id.data, week_start)
 
         if is_locked:
             flash(
@@ -860,22 +774,10 @@ def worker_timesheet(entry_id=None):
             # Re-render the form with preserved values instead of redirecting
             return render_template('worker/timesheet.html', form=fresh_form, editing=editing, entry_to_edit=entry_to_edit)
 
-        # Extract all labor activities from the form and calculate total hours
-        total_hours_for_day = 0
-        labor_activities = []
-        for key in request.form.keys():
-            if key.startswith('labor_activity_') and key != 'labor_activity_1':
-                index = key.split('_')[-1]
-                activity_id = request.form.get(f'labor_activity_{index}')
-                hours = request.form.get(f'hours_{index}')
-                hours_value = float(hours) if hours and hours.strip() else 0.0
-                if hours_value > 0:
-                    total_hours_for_day += hours_value
-
-        # Add hours from first activity if valid
-        hours_value = form.hours_1.data or 0.0
-        if hours_value > 0:
-            total_hours_for_day += hours_value
+        # Total the hours being submitted across all rows
+        total_hours_for_day = sum(hours for _, hours in extra_rows if hours > 0)
+        if first_hours > 0:
+            total_hours_for_day += first_hours
 
         # Get existing hours for this day from ALL jobs/activities
         # to properly enforce 12-hour daily maximum
@@ -901,24 +803,11 @@ def worker_timesheet(entry_id=None):
             # Re-render the form with preserved values instead of redirecting
             return render_template('worker/timesheet.html', form=fresh_form, editing=editing, entry_to_edit=entry_to_edit)
 
-        # Extract all labor activities from the form
-        labor_activities = []
-        for key in request.form.keys():
-            if key.startswith('labor_activity_') and key != 'labor_activity_1':
-                index = key.split('_')[-1]
-                activity_id = request.form.get(f'labor_activity_{index}')
-                hours = request.form.get(f'hours_{index}')
-
-                # With our improved FloatField handling, this is now cleaner
-                hours_value = float(hours) if hours and hours.strip() else 0.0
-                if activity_id and hours_value > 0:
-                    labor_activities.append((int(activity_id), hours_value))
-
-        # Add the first activity if it's valid
-        # With our improved FloatField, we can directly access the data
-        hours_value = form.hours_1.data or 0.0
-        if form.labor_activity_1.data and hours_value > 0:
-            labor_activities.append((form.labor_activity_1.data, hours_value))
+        # Keep the rows that have both an activity and hours
+        labor_activities = [(activity_id, hours) for activity_id, hours in extra_rows
+                            if activity_id and hours > 0]
+        if form.labor_activity_1.data and first_hours > 0:
+            labor_activities.append((form.labor_activity_1.data, first_hours))
 
         # Ensure we have at least one valid labor activity
         if not labor_activities:
@@ -929,9 +818,6 @@ def worker_timesheet(entry_id=None):
             # Re-render the form with preserved values instead of redirecting
             return render_template('worker/timesheet.html', form=fresh_form, editing=editing, entry_to_edit=entry_to_edit)
 
-        # Get all activity IDs that will be submitted
-        activity_ids = [act_id for act_id, _ in labor_activities]
-
         # Handle editing vs new entry creation differently
         if editing and entry_to_edit and len(labor_activities) == 1:
             # Simple edit case: update the existing entry in place
@@ -941,29 +827,31 @@ def worker_timesheet(entry_id=None):
             entry_to_edit.date = form.date.data
             entry_to_edit.hours = hours
             entry_to_edit.notes = form.notes.data
-            print(f"DEBUG EDIT: Updated entry {entry_to_edit.id} - Job: {entry_to_edit.job_id}, Hours: {entry_to_edit.hours}, Activity: {entry_to_edit.labor_activity_id}")
+            app.logger.debug("Updated entry %s - Job: %s, Hours: %s, Activity: %s",
+                             entry_to_edit.id, entry_to_edit.job_id, entry_to_edit.hours,
+                             entry_to_edit.labor_activity_id)
         else:
             # Complex case: delete original and recreate (for multiple activities or new entries)
             if editing and entry_to_edit:
                 # Delete the original entry when editing becomes complex
                 db.session.delete(entry_to_edit)
-                
-            # For new entries, delete existing entries to avoid duplicates
-            if not editing:
-                TimeEntry.query.filter(TimeEntry.user_id == current_user.id,
-                                       TimeEntry.job_id == form.job_id.data,
-                                       TimeEntry.labor_activity_id.in_(activity_ids),
-                                       TimeEntry.date == form.date.data).delete()
-
-            # Create new entries for each activity
-            for activity_id, hours in labor_activities:
-                new_entry = TimeEntry(user_id=current_user.id,
-                                      job_id=form.job_id.data,
-                                      labor_activity_id=activity_id,
-                                      date=form.date.data,
-                                      hours=hours,
-                                      notes=form.notes.data)
-                db.session.add(new_entry)
+
+            # Insert all activities in one statement; an existing entry for the same
+            # activity and date is updated in place via the unique_time_entry constraint
+            # (ORM execute autoflushes the pending delete above first)
+            upsert = pg_insert(TimeEntry).values([
+                {'user_id': current_user.id,
+                 'job_id': form.job_id.data,
+                 'labor_activity_id': activity_id,
+                 'date': form.date.data,
+                 'hours': hours,
+                 'notes': form.notes.data}
+                for activity_id, hours in labor_activities
+            ])
+            upsert = upsert.on_conflict_do_update(
+                constraint='unique_time_entry',
+                set_={'hours': upsert.excluded.hours, 'notes': upsert.excluded.notes})
+            db.session.execute(upsert)
 
         db.session.commit()
         flash('Time entry saved successfully!', 'success')
@@ -988,76 +876,23 @@ def worker_timesheet(entry_id=None):
 @worker_required
 def worker_history():
     # Get date range parameters from query string
-    start_date_str = request.args.get('start_date')
-    week_offset_str = request.args.get('week_offset', '0')
-
-    try:
-        week_offset = int(week_offset_str)
-    except ValueError:
-        week_offset = 0
-        print(
-            f"WARNING: Invalid week_offset value: {week_offset_str}, defaulting to 0"
-        )
-
-    # If a specific start_date is provided, parse it and find its week offset
-    if start_date_str:
-        try:
-            # Try both common formats: %m/%d/%Y and %Y-%m-%d
-            if '/' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str,
-                                                '%m/%d/%Y').date()
-            elif '-' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str,
-                                                '%Y-%m-%d').date()
-            else:
-                print(
-                    f"WARNING: Invalid date format in start_date: {start_date_str}"
-                )
-                parsed_date = None
-
-            # Use the parsed date to calculate the appropriate week
-            if parsed_date:
-                # Always align to Monday
-                monday_date = get_week_start(parsed_date)
-                print(
-                    f"DEBUG: Aligned date {parsed_date} to Monday: {monday_date}"
-                )
-                # Use this explicitly provided date
-                start_date, end_date = monday_date, monday_date + timedelta(
-                    days=6)
-            else:
-                # Fall back to the current week with offset
-                start_date, end_date = get_week_range_for_offset(week_offset)
-        except ValueError as e:
-            print(
-                f"WARNING: Error parsing start_date '{start_date_str}': {str(e)}"
-            )
-            # Fall back to the current week with offset
-            start_date, end_date = get_week_range_for_offset(week_offset)
-    else:
-        # No specific date provided, use the week_offset
-        start_date, end_date = get_week_range_for_offset(week_offset)
+    start_date, end_date, week_offset = get_week_range_from_request()
 
-    print(
-        f"DEBUG: Week calculation - date range: {start_date} to {end_date}, week_offset: {week_offset}"
-    )
+    app.logger.debug("Worker history range: %s to %s, week_offset: %s", start_date, end_date, week_offset)
 
-    # Get time entries for the date range
+    # Get time entries for the date range, with the job and activity the template shows
     entries = TimeEntry.query.filter(
         TimeEntry.user_id == current_user.id, TimeEntry.date >= start_date,
-        TimeEntry.date <= end_date).order_by(TimeEntry.date.desc()).all()
-
-    # Group entries by date for display
-    entries_by_date = {}
-    for entry in entries:
-        if entry.date not in entries_by_date:
-            entries_by_date[entry.date] = []
-        entries_by_date[entry.date].append(entry)
-    
-    # Debug: Print the entries_by_date structure
-    print(f"DEBUG: entries_by_date keys: {list(entries_by_date.keys())}")
-    for date, date_entries in entries_by_date.items():
-        print(f"DEBUG: Date {date} has {len(date_entries)} entries")
+        TimeEntry.date <= end_date).options(
+            _unused_relations_load(db.joinedload(TimeEntry.job)),
+            _unused_relations_load(db.joinedload(TimeEntry.labor_activity)),
+            _unused_relations_load()).order_by(TimeEntry.date.desc()).all()
+
+    # Group entries by date for display (the query already orders by date)
+    entries_by_date = {
+        entry_date: list(day_entries)
+        for entry_date, day_entries in groupby(entries, key=attrgetter('date'))
+    }
 
     # Get weekly approval status
     week_start = get_week_start(start_date)
@@ -1110,10 +945,10 @@ def worker_clock():
                           ClockSession.clock_in <= today_end).order_by(
                               ClockSession.clock_in.desc()).all()
 
-        # Calculate today's hours from completed sessions
-        today_hours = sum(session.get_duration_hours()
-                          for session in today_sessions
-                          if not session.is_active)
+        # Calculate today's hours and session count from the completed sessions
+        # already loaded for display, rather than a separate aggregate query
+        completed_today = [session for session in today_sessions if not session.is_active]
+        today_hours = sum(session.get_duration_hours() for session in completed_today)
 
         # Get recent sessions (completed, not including today)
         recent_sessions = ClockSession.query.options(
@@ -1126,9 +961,14 @@ def worker_clock():
                           ClockSession.clock_in < today_start).order_by(
                               ClockSession.clock_in.desc()).limit(5).all()
 
-        # Prepare forms
-        clock_in_form = ClockInForm(current_user=current_user)
-        clock_out_form = ClockOutForm()
+        # Prepare only the form the page shows; building ClockInForm queries the
+        # worker's jobs and activities for its choices
+        if active_session:
+            clock_in_form = None
+            clock_out_form = ClockOutForm()
+        else:
+            clock_in_form = ClockInForm(current_user=current_user)
+            clock_out_form = None
     except Exception as e:
         # Log the error
         app.logger.error(
@@ -1144,31 +984,57 @@ def worker_clock():
                            today_sessions=today_sessions,
                            recent_sessions=recent_sessions,
                            today_hours=today_hours,
-                           session_count=len(
-                               [s for s in today_sessions if not s.is_active]),
+                           session_count=len(completed_today),
                            clock_in_form=clock_in_form,
                            clock_out_form=clock_out_form)
 
 
+def _to_float(value):
+    """Parse a posted coordinate/accuracy value, or None if missing, invalid or
+    not finite (float() accepts 'inf' and 'nan')"""
+    if value is None or value == '':
+        return None
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return result if math.isfinite(result) else None
+
+
+def _posted_location():
+    """(latitude, longitude) floats from the submitted form, or (None, None)
+    unless both are present and valid"""
+    latitude = _to_float(request.form.get('latitude'))
+    longitude = _to_float(request.form.get('longitude'))
+    if latitude is None or longitude is None:
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+
 @app.route('/api/device-log', methods=['POST'])
 @login_required
 def log_device_action():
     """Silent device logging endpoint for audit trail"""
     try:
         data = request.get_json()
-        
-        device_log = DeviceLog(
+
+        action = data.get('action')  # 'IN' or 'OUT'
+        if not action:
+            return jsonify({'success': False, 'error': 'action is required'}), 400
+
+        # Written in the next background batch rather than committed here, so a
+        # bad row has to be caught now instead of failing the whole batch later
+        utils.queue_device_log(
             user_id=current_user.id,
-            action=data.get('action'),  # 'IN' or 'OUT'
-            device_id=data.get('deviceId'),
+            action=str(action)[:10],
+            device_id=str(data['deviceId'])[:36] if data.get('deviceId') else None,
             ua=data.get('userAgent'),
-            lat=data.get('lat'),
-            lng=data.get('lng')
+            lat=_to_float(data.get('lat')),
+            lng=_to_float(data.get('lng'))
         )
-        
-        db.session.add(device_log)
-        db.session.commit()
-        
+
         return jsonify({'success': True}), 200
         
     except Exception as e:
@@ -1208,10 +1074,8 @@ def clock_in():
         # Load job separately (can't use joinedload with FOR UPDATE)
         job = Job.query.get(active_session.job_id)
         # Format clock-in time in Pacific timezone for the error message
-        utc = ZoneInfo('UTC')
-        pacific = ZoneInfo('America/Los_Angeles')
-        clock_in_utc = active_session.clock_in.replace(tzinfo=utc)
-        clock_in_pacific = clock_in_utc.astimezone(pacific)
+        clock_in_utc = active_session.clock_in.replace(tzinfo=ZoneInfo('UTC'))
+        clock_in_pacific = clock_in_utc.astimezone(PACIFIC_TZ)
         clock_in_time_str = clock_in_pacific.strftime('%I:%M %p').lstrip('0')
         job_code = job.job_code if job else 'Unknown'
         job_name = job.description if job else 'Unknown Job'
@@ -1224,7 +1088,7 @@ def clock_in():
 
     if form.validate_on_submit():
         # Get job information for validation and distance calculation
-        job = Job.query.get(form.job_id.data)
+        job = db.session.get(Job, form.job_id.data)
         if not job:
             flash('Selected job not found.', 'danger')
             return redirect(url_for('worker_clock'))
@@ -1250,31 +1114,17 @@ def clock_in():
             flash('Selected work activity is not available for this job and your qualifications.', 'danger')
             return redirect(url_for('worker_clock'))
         
-        # Get location data from form
-        latitude = request.form.get('latitude')
-        longitude = request.form.get('longitude')
-        accuracy = request.form.get('accuracy')
+        # Get location data from form, parsed once (None if missing or invalid)
+        latitude, longitude = _posted_location()
+        accuracy = _to_float(request.form.get('accuracy'))
         distance_m = None
         distance_miles = None
 
         # Calculate distance if we have both user location and job coordinates
-        if latitude and longitude and job.latitude and job.longitude:
-            try:
-                # Convert string values to float
-                lat1 = float(latitude)
-                lon1 = float(longitude)
-                lat2 = float(job.latitude)
-                lon2 = float(job.longitude)
-
-                # Calculate the distance
-                distance_m = utils.calculate_distance(lat1, lon1, lat2, lon2)
-                # Convert to miles (1 meter = 1/1609.34 miles)
-                distance_miles = round(distance_m / 1609.34,
-                                       2) if distance_m is not None else None
-            except (ValueError, TypeError) as e:
-                print(f"Error calculating distance: {str(e)}")
-                # Continue without distance if calculation fails
-                distance_miles = None
+        if latitude is not None and job.latitude and job.longitude:
+            distance_m = utils.calculate_distance(latitude, longitude, job.latitude, job.longitude)
+            # Convert to miles (1 meter = 1/1609.34 miles)
+            distance_miles = round(distance_m / 1609.34, 2)
 
         # Create new clock session
         session = ClockSession(
@@ -1285,9 +1135,9 @@ def clock_in():
             clock_in=datetime.utcnow(),
             is_active=True,
             # Store location data
-            clock_in_latitude=float(latitude) if latitude else None,
-            clock_in_longitude=float(longitude) if longitude else None,
-            clock_in_accuracy=float(accuracy) if accuracy else None,
+            clock_in_latitude=latitude,
+            clock_in_longitude=longitude,
+            clock_in_accuracy=accuracy,
             clock_in_distance_mi=distance_miles)
 
         db.session.add(session)
@@ -1395,42 +1245,28 @@ def clock_out():
         if form.notes.data:
             active_session.notes = form.notes.data
 
-        # Get location data from form
-        latitude = request.form.get('latitude')
-        longitude = request.form.get('longitude')
-        accuracy = request.form.get('accuracy')
+        # Get location data from form, parsed once (None if missing or invalid)
+        latitude, longitude = _posted_location()
+        accuracy = _to_float(request.form.get('accuracy'))
 
-        # Get job information for distance calculation
-        job = Job.query.get(active_session.job_id)
         distance_m = None
         distance_miles = None
 
+        # Only look up the job's coordinates when the browser sent a location
+        job = db.session.get(Job, active_session.job_id) if latitude is not None else None
+
         # Calculate distance if we have both user location and job coordinates
-        if latitude and longitude and job.latitude and job.longitude:
-            try:
-                # Convert string values to float
-                lat1 = float(latitude)
-                lon1 = float(longitude)
-                lat2 = float(job.latitude)
-                lon2 = float(job.longitude)
-
-                # Calculate the distance
-                distance_m = utils.calculate_distance(lat1, lon1, lat2, lon2)
-                # Convert to miles (1 meter = 1/1609.34 miles)
-                distance_miles = round(distance_m / 1609.34,
-                                       2) if distance_m is not None else None
-            except (ValueError, TypeError) as e:
-                print(f"Error calculating distance: {str(e)}")
-                # Continue without distance if calculation fails
-                distance_miles = None
+        if job and job.latitude and job.longitude:
+            distance_m = utils.calculate_distance(latitude, longitude, job.latitude, job.longitude)
+            # Convert to miles (1 meter = 1/1609.34 miles)
+            distance_miles = round(distance_m / 1609.34, 2)
 
         # Store location data
-        if latitude:
-            active_session.clock_out_latitude = float(latitude)
-        if longitude:
-            active_session.clock_out_longitude = float(longitude)
-        if accuracy:
-            active_session.clock_out_accuracy = float(accuracy)
+        if latitude is not None:
+            active_session.clock_out_latitude = latitude
+            active_session.clock_out_longitude = longitude
+        if accuracy is not None:
+            active_session.clock_out_accuracy = accuracy
         if distance_m is not None:
             active_session.clock_out_distance_mi = distance_miles
 
@@ -1492,117 +1328,59 @@ def clock_out():
 @foreman_required
 def foreman_dashboard():
     # Get date range parameters from query string
-    start_date_str = request.args.get('start_date')
-    week_offset_str = request.args.get('week_offset', '0')
-
-    try:
-        week_offset = int(week_offset_str)
-    except ValueError:
-        week_offset = 0
-        print(
-            f"WARNING: Invalid week_offset value: {week_offset_str}, defaulting to 0"
-        )
-
-    # If a specific start_date is provided, parse it and find its week offset
-    if start_date_str:
-        try:
-            # Try both common formats: %m/%d/%Y and %Y-%m-%d
-            if '/' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str,
-                                                '%m/%d/%Y').date()
-            elif '-' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str,
-                                                '%Y-%m-%d').date()
-            else:
-                print(
-                    f"WARNING: Invalid date format in start_date: {start_date_str}"
-                )
-                parsed_date = None
-
-            # Use the parsed date to calculate the appropriate week
-            if parsed_date:
-                # Always align to Monday
-                monday_date = get_week_start(parsed_date)
-                print(
-                    f"DEBUG: Aligned date {parsed_date} to Monday: {monday_date}"
-                )
-                # Use this explicitly provided date
-                start_date, end_date = monday_date, monday_date + timedelta(
-                    days=6)
-            else:
-                # Fall back to the current week with offset
-                start_date, end_date = get_week_range_for_offset(week_offset)
-        except ValueError as e:
-            print(
-                f"WARNING: Error parsing start_date '{start_date_str}': {str(e)}"
-            )
-            # Fall back to the current week with offset
-            start_date, end_date = get_week_range_for_offset(week_offset)
-    else:
-        # No specific date provided, use the week_offset
-        start_date, end_date = get_week_range_for_offset(week_offset)
-
-    print(
-        f"DEBUG: Week calculation for foreman dashboard - date range: {start_date} to {end_date}, week_offset: {week_offset}"
-    )
-
-    # Get all active jobs
-    jobs = Job.query.filter_by(status='active').all()
-
-    # For each job, get all workers with time entries
+    start_date, end_date, week_offset = get_week_range_from_request()
+
+    app.logger.debug("Foreman dashboard range: %s to %s, week_offset: %s", start_date, end_date, week_offset)
+
+    # Get all active jobs, with just the columns the job cards show
+    jobs = Job.query.options(
+        load_only(Job.id, Job.job_code, Job.description, Job.trade_type),
+        db.lazyload(Job.foreman)).filter_by(status='active').all()
+
+    # Per (job, worker) totals for the week in one grouped query
+    week_totals = db.session.query(
+        TimeEntry.job_id,
+        TimeEntry.user_id,
+        db.func.sum(TimeEntry.hours),
+        db.func.count(db.func.distinct(TimeEntry.date)),
+        # NULL notes are ignored by bool_or, blank ones compare False
+        db.func.bool_or(db.func.trim(TimeEntry.notes) != '')
+    ).join(User, User.id == TimeEntry.user_id).filter(
+        TimeEntry.job_id.in_([job.id for job in jobs]),
+        TimeEntry.date >= start_date,
+        TimeEntry.date <= end_date,
+        User.role == 'worker'
+    ).group_by(TimeEntry.job_id, TimeEntry.user_id).all()
+
+    # Load every worker that appears in the totals at once
+    worker_ids = {user_id for _, user_id, _, _, _ in week_totals}
+    workers_by_id = {}
+    if worker_ids:
+        workers_by_id = {worker.id: worker
+                         for worker in User.query.filter(User.id.in_(worker_ids)).all()}
+
+    # Approval locks for the week, loaded once as (worker, job) pairs
+    approved_pairs = {
+        (lock.user_id, lock.job_id)
+        for lock in db.session.query(WeeklyApprovalLock.user_id, WeeklyApprovalLock.job_id).filter(
+            WeeklyApprovalLock.week_start == start_date,
+            WeeklyApprovalLock.job_id.in_([job.id for job in jobs]))
+    }
+
+    totals_by_job = {}
+    for job_id, user_id, total_hours, days_with_entries, has_notes in week_totals:
+        totals_by_job.setdefault(job_id, []).append(
+            (workers_by_id[user_id], total_hours or 0, days_with_entries, bool(has_notes)))
+
+    # For each job, build the worker rows from the grouped totals
     job_data = []
     for job in jobs:
-        # Get unique workers who submitted time for this job in the date range
-        workers_query = db.session.query(User).join(TimeEntry, User.id == TimeEntry.user_id).\
-            filter(
-                TimeEntry.job_id == job.id,
-                TimeEntry.date >= start_date,
-                TimeEntry.date <= end_date,
-                User.role == 'worker'
-            ).distinct()
-
-        workers = workers_query.all()
-
-        # Get weekly approval status for each worker
         workers_data = []
-        for worker in workers:
-            # Check if the week is approved for this worker/job
-            is_approved = WeeklyApprovalLock.query.filter_by(
-                user_id=worker.id, job_id=job.id,
-                week_start=start_date).first() is not None
-
-            # Count total hours for the week
-            total_hours = db.session.query(db.func.sum(TimeEntry.hours)).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date
-                ).scalar() or 0
-
-            # Check if all 7 days of the week have entries
-            days_with_entries = db.session.query(TimeEntry.date).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date
-                ).distinct().count()
-
-            # Check if worker has any entries with notes for this job and week
-            has_notes = db.session.query(TimeEntry).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date,
-                    TimeEntry.notes.isnot(None),
-                    db.func.trim(TimeEntry.notes) != ''
-                ).first() is not None
-
+        for worker, total_hours, days_with_entries, has_notes in sorted(
+                totals_by_job.get(job.id, []), key=lambda row: row[0].name):
             workers_data.append({
                 'worker': worker,
-                'is_approved': is_approved,
+                'is_approved': (worker.id, job.id) in approved_pairs,
                 'total_hours': total_hours,
                 'days_with_entries': days_with_entries,
                 'has_all_days':
@@ -1619,13 +1397,32 @@ def foreman_dashboard():
                            end_date=end_date)
 
 
+def _week_entries_for_display(user_id, job_id, week_start, week_end):
+    """A worker's entries on a job for the week, ALL activities, for the enter-time page.
+
+    Only needed when the page is rendered, not on a save that redirects. Loads just
+    the columns the page reads: date, hours, notes and the activity name.
+    """
+    return TimeEntry.query.filter(
+        TimeEntry.user_id == user_id,
+        TimeEntry.job_id == job_id,
+        TimeEntry.date >= week_start,
+        TimeEntry.date <= week_end
+    ).options(
+        load_only(TimeEntry.date, TimeEntry.hours, TimeEntry.notes, TimeEntry.labor_activity_id),
+        _unused_relations_load(db.joinedload(TimeEntry.labor_activity).load_only(LaborActivity.name)),
+        _unused_relations_load()
+    ).order_by(TimeEntry.date, TimeEntry.labor_activity_id).all()
+
+
 @app.route('/foreman/enter_time/<int:job_id>/<int:user_id>',
            methods=['GET', 'POST'])
 @login_required
 @foreman_or_admin_required
 def foreman_enter_time(job_id, user_id):
     """Allow foremen to enter time on behalf of a worker"""
-    print(f"DEBUG: foreman_enter_time called - method={request.method}, job_id={job_id}, user_id={user_id}")
+    app.logger.debug("foreman_enter_time called - method=%s, job_id=%s, user_id=%s",
+                     request.method, job_id, user_id)
     # Get the worker and job
     worker = User.query.get_or_404(user_id)
     job = Job.query.get_or_404(job_id)
@@ -1644,34 +1441,12 @@ def foreman_enter_time(job_id, user_id):
     # Get week start from query parameters or default to current week
     selected_week = request.args.get('week_start')
     if selected_week:
-        try:
-            # Try both common formats: %m/%d/%Y and %Y-%m-%d
-            if '/' in selected_week:
-                parsed_date = datetime.strptime(selected_week,
-                                                '%m/%d/%Y').date()
-            elif '-' in selected_week:
-                parsed_date = datetime.strptime(selected_week,
-                                                '%Y-%m-%d').date()
-            else:
-                print(
-                    f"WARNING: Invalid date format in week_start: {selected_week}"
-                )
-                parsed_date = None
-
+        parsed_date = parse_flexible_date(selected_week)
+        if parsed_date:
             # Always align to Monday
-            if parsed_date:
-                form.week_start.data = get_week_start(parsed_date)
-                print(
-                    f"DEBUG: Aligned date {parsed_date} to Monday: {form.week_start.data}"
-                )
-            else:
-                # Fall back to current week
-                today = date.today()
-                form.week_start.data = get_week_start(today)
-        except ValueError as e:
-            print(
-                f"WARNING: Error parsing week_start '{selected_week}': {str(e)}"
-            )
+            form.week_start.data = get_week_start(parsed_date)
+        else:
+            app.logger.warning("Invalid week_start %r, using the current week", selected_week)
             # Fall back to current week
             today = date.today()
             form.week_start.data = get_week_start(today)
@@ -1683,37 +1458,29 @@ def foreman_enter_time(job_id, user_id):
     week_start = form.week_start.data
     week_end = week_start + timedelta(days=6)
 
-    # Check if this week is already approved
-    existing_approval = WeeklyApprovalLock.query.filter_by(
-        user_id=user_id, job_id=job_id, week_start=week_start).first()
+    # Check if this week is already approved (always checked fresh before a save)
+    existing_approval = utils.approval_lock_summary(
+        user_id, job_id, week_start, use_cache=request.method == 'GET')
 
     if existing_approval:
+        approver_name, approved_at = existing_approval
         flash(
-            f'This week was already approved by {existing_approval.approver.name} on {existing_approval.approved_at.strftime("%m/%d/%Y %H:%M")}. Time entries cannot be modified.',
+            f'This week was already approved by {approver_name} on {approved_at.strftime("%m/%d/%Y %H:%M")}. Time entries cannot be modified.',
             'warning')
         # Pass the week_start to maintain the selected date when redirecting
         return redirect(
             url_for('foreman_dashboard',
                     start_date=week_start.strftime('%m/%d/%Y')))
 
-    # Get existing entries for display purposes - ALL activities for the week
-    all_existing_entries = TimeEntry.query.filter(
-        TimeEntry.user_id == user_id,
-        TimeEntry.job_id == job_id,
-        TimeEntry.date >= week_start,
-        TimeEntry.date <= week_end
-    ).options(db.joinedload(TimeEntry.labor_activity)).order_by(TimeEntry.date, TimeEntry.labor_activity_id).all()
-
-    if form.validate_on_submit():
+    # Validate once and reuse the result below
+    is_valid = form.validate_on_submit()
+    if is_valid:
         # Handle "ALL" view - allow quick daily total adjustments
         if form.labor_activity_id.data == 'ALL':
             # Get General Work labor activity for this job's trade
-            general_work_activity = LaborActivity.query.filter_by(
-                name='General Work',
-                trade_category=job.trade_type
-            ).first()
+            general_work_activity_id = utils.general_work_activity_id(job.trade_type)
             
-            if not general_work_activity:
+            if not general_work_activity_id:
                 flash('General Work labor activity not found for this trade type.', 'danger')
                 return render_template('foreman/enter_time.html',
                                      form=form,
@@ -1721,8 +1488,9 @@ def foreman_enter_time(job_id, user_id):
                                      job=job,
                                      week_start=week_start,
                                      week_end=week_end,
-                                     existing_entries=existing_entries,
-                                     all_existing_entries=all_existing_entries)
+                                     existing_entries=[],
+                                     all_existing_entries=_week_entries_for_display(
+                                         user_id, job_id, week_start, week_end))
             
             # Handle daily total adjustments by calculating differences and creating General Work entries
             monday = form.week_start.data
@@ -1737,36 +1505,45 @@ def foreman_enter_time(job_id, user_id):
                 form.sunday_hours.data or 0
             ]
             
-            for i, (date, target_hours) in enumerate(zip(dates, hours)):
-                # Calculate current total for this day across all activities
-                current_total = db.session.query(func.sum(TimeEntry.hours)).filter(
+            # Current daily totals on this job across all activities, in one grouped query
+            current_totals = dict(db.session.query(
+                TimeEntry.date, func.sum(TimeEntry.hours)).filter(
                     TimeEntry.user_id == user_id,
                     TimeEntry.job_id == job_id,
-                    TimeEntry.date == date
-                ).scalar() or 0
+                    TimeEntry.date >= dates[0],
+                    TimeEntry.date <= dates[6]).group_by(TimeEntry.date).all())
+
+            # The week's existing General Work entries, loaded once for any reductions
+            general_work_by_date = {}
+            if any(target_hours < current_totals.get(day, 0) for day, target_hours in zip(dates, hours)):
+                for entry in TimeEntry.query.filter(
+                        TimeEntry.user_id == user_id,
+                        TimeEntry.job_id == job_id,
+                        TimeEntry.labor_activity_id == general_work_activity_id,
+                        TimeEntry.date >= dates[0],
+                        TimeEntry.date <= dates[6]).options(_unused_relations_load()):
+                    general_work_by_date.setdefault(entry.date, []).append(entry)
+
+            additions = []
+            for i, (date, target_hours) in enumerate(zip(dates, hours)):
+                current_total = current_totals.get(date, 0)
                 
                 # Calculate difference
                 difference = target_hours - current_total
                 
                 if difference > 0:
                     # Add additional time as General Work
-                    new_entry = TimeEntry(
-                        user_id=user_id,
-                        job_id=job_id,
-                        labor_activity_id=general_work_activity.id,
-                        date=date,
-                        hours=difference,
-                        notes=form.notes.data
-                    )
-                    db.session.add(new_entry)
+                    additions.append({
+                        'user_id': user_id,
+                        'job_id': job_id,
+                        'labor_activity_id': general_work_activity_id,
+                        'date': date,
+                        'hours': difference,
+                        'notes': form.notes.data
+                    })
                 elif difference < 0:
                     # If target is less than current, try to reduce existing General Work entries first
-                    general_work_entries = TimeEntry.query.filter(
-                        TimeEntry.user_id == user_id,
-                        TimeEntry.job_id == job_id,
-                        TimeEntry.labor_activity_id == general_work_activity.id,
-                        TimeEntry.date == date
-                    ).all()
+                    general_work_entries = general_work_by_date.get(date, [])
                     
                     reduction_needed = abs(difference)
                     for entry in general_work_entries:
@@ -1782,6 +1559,15 @@ def foreman_enter_time(job_id, user_id):
                             reduction_needed = 0
             
             try:
+                if additions:
+                    # Add all days in one statement; a day that already has General Work
+                    # gets the extra hours added to it via the unique_time_entry constraint
+                    upsert = pg_insert(TimeEntry).values(additions)
+                    upsert = upsert.on_conflict_do_update(
+                        constraint='unique_time_entry',
+                        set_={'hours': TimeEntry.hours + upsert.excluded.hours,
+                              'notes': upsert.excluded.notes})
+                    db.session.execute(upsert)
                 db.session.commit()
                 flash(f'Daily total adjustments saved successfully for {worker.name}. Additional time added as General Work.', 'success')
             except Exception as e:
@@ -1806,6 +1592,22 @@ def foreman_enter_time(job_id, user_id):
             form.sunday_hours.data
         ]
 
+        # Worker's daily totals for the week across ALL jobs/activities, and for the
+        # current job/activity, each in one grouped query
+        daily_totals = dict(db.session.query(
+            TimeEntry.date, db.func.sum(TimeEntry.hours)).filter(
+                TimeEntry.user_id == user_id,
+                TimeEntry.date >= dates[0],
+                TimeEntry.date <= dates[6]).group_by(TimeEntry.date).all())
+        same_activity_totals = dict(db.session.query(
+            TimeEntry.date, db.func.sum(TimeEntry.hours)).filter(
+                TimeEntry.user_id == user_id,
+                TimeEntry.date >= dates[0],
+                TimeEntry.date <= dates[6],
+                TimeEntry.job_id == job_id,
+                TimeEntry.labor_activity_id == form.labor_activity_id.data).group_by(
+                    TimeEntry.date).all())
+
         # First, check maximum 12 hours per day limit BEFORE deletion
         for i, date_val in enumerate(dates):
             # Get hours from current form for this day
@@ -1814,31 +1616,17 @@ def foreman_enter_time(job_id, user_id):
             ] else 0
 
             if current_hours and float(current_hours) > 0:
-                # Get existing hours for this day from ALL jobs/activities
-                existing_hours = db.session.query(db.func.sum(
-                    TimeEntry.hours)).filter(
-                        TimeEntry.user_id == user_id, 
-                        TimeEntry.date == date_val).scalar() or 0
-                
-                # Subtract hours from current job/activity to avoid double-counting when editing
-                current_job_activity_hours = db.session.query(db.func.sum(
-                    TimeEntry.hours)).filter(
-                        TimeEntry.user_id == user_id,
-                        TimeEntry.date == date_val,
-                        TimeEntry.job_id == job_id,
-                        TimeEntry.labor_activity_id == form.labor_activity_id.data).scalar() or 0
-                existing_hours -= current_job_activity_hours
+                # Existing hours for this day from ALL jobs/activities, minus the current
+                # job/activity to avoid double-counting when editing
+                existing_hours = daily_totals.get(date_val, 0) - same_activity_totals.get(date_val, 0)
 
                 total_hours = existing_hours + float(current_hours)
 
-                print(f"DEBUG: Day {i} ({date_val}): current_hours={current_hours}, existing_hours={existing_hours}, total_hours={total_hours}")
+                app.logger.debug("Day %s (%s): current_hours=%s, existing_hours=%s, total_hours=%s",
+                                 i, date_val, current_hours, existing_hours, total_hours)
 
                 if total_hours > 12:
-                    day_name = [
-                        'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
-                        'Saturday', 'Sunday'
-                    ][i]
-                    print(f"DEBUG: Validation failed - total_hours {total_hours} > 12 for {worker.name} on {day_name}")
+                    day_name = DAY_NAMES[i]
                     flash(
                         f'Maximum 12 hours per day exceeded for {worker.name} on {day_name}. They already have {existing_hours:.1f} hours recorded for this day. The total would be {total_hours:.1f} hours.',
                         'danger')
@@ -1849,8 +1637,9 @@ def foreman_enter_time(job_id, user_id):
                                          job=job,
                                          week_start=week_start,
                                          week_end=week_end,
-                                         existing_entries=existing_entries,
-                                         all_existing_entries=all_existing_entries)
+                                         existing_entries=[],
+                                         all_existing_entries=_week_entries_for_display(
+                                             user_id, job_id, week_start, week_end))
 
         # Check maximum 60 hours per week limit
         # Get existing weekly hours across all jobs for this worker
@@ -1884,8 +1673,9 @@ def foreman_enter_time(job_id, user_id):
                                  job=job,
                                  week_start=week_start,
                                  week_end=week_end,
-                                 existing_entries=existing_entries,
-                                 all_existing_entries=all_existing_entries)
+                                 existing_entries=[],
+                                 all_existing_entries=_week_entries_for_display(
+                                     user_id, job_id, week_start, week_end))
 
         # After validation passes, delete any existing entries for this week with the same activity
         # This ensures we don't get duplicate entries if the foreman submits multiple times
@@ -1894,21 +1684,20 @@ def foreman_enter_time(job_id, user_id):
             TimeEntry.labor_activity_id == form.labor_activity_id.data,
             TimeEntry.date >= dates[0], TimeEntry.date <= dates[6]).delete()
 
-        # Now create new entries for days with hours > 0
-        for i, date_val in enumerate(dates):
-            # Convert None or empty string to 0 to avoid comparison errors
-            hours_value = hours_values[i] if hours_values[i] not in [None, ''
-                                                                     ] else 0
-            if hours_value and float(hours_value) > 0:
-                # Create a new entry
-                entry = TimeEntry(
-                    user_id=user_id,
-                    job_id=job_id,
-                    labor_activity_id=form.labor_activity_id.data,
-                    date=date_val,
-                    hours=float(hours_value),  # Use the converted value
-                    notes=form.notes.data)
-                db.session.add(entry)
+        # Now create new entries for days with hours > 0 in one multi-row INSERT
+        # Convert None or empty string to 0 to avoid comparison errors
+        entry_rows = [
+            {'user_id': user_id,
+             'job_id': job_id,
+             'labor_activity_id': form.labor_activity_id.data,
+             'date': date_val,
+             'hours': float(hours_value),
+             'notes': form.notes.data}
+            for date_val, hours_value in zip(dates, hours_values)
+            if hours_value not in [None, ''] and float(hours_value) > 0
+        ]
+        if entry_rows:
+            db.session.execute(insert(TimeEntry), entry_rows)
 
         db.session.commit()
         flash(
@@ -1927,27 +1716,23 @@ def foreman_enter_time(job_id, user_id):
 
     # Initialize for template context
     existing_entries = []
+    all_existing_entries = _week_entries_for_display(user_id, job_id, week_start, week_end)
 
     # Check if this is a GET request or if form failed validation
-    if request.method == 'GET' or not form.validate():
+    if request.method == 'GET' or not is_valid:
+        day_fields = (form.monday_hours, form.tuesday_hours, form.wednesday_hours,
+                      form.thursday_hours, form.friday_hours, form.saturday_hours,
+                      form.sunday_hours)
+
         # Set all hours fields to 0 by default
-        form.monday_hours.data = 0.0
-        form.tuesday_hours.data = 0.0
-        form.wednesday_hours.data = 0.0
-        form.thursday_hours.data = 0.0
-        form.friday_hours.data = 0.0
-        form.saturday_hours.data = 0.0
-        form.sunday_hours.data = 0.0
-
-        # Load existing entries for this week with eager loading of labor_activity
+        for field in day_fields:
+            field.data = 0.0
+
+        # Existing entries for this week come from the ALL-activities list the page shows
         if form.labor_activity_id.data and form.labor_activity_id.data != 'ALL':
             # If specific labor activity is selected, get entries for that activity only
-            existing_entries = TimeEntry.query.filter(
-                TimeEntry.user_id == user_id, TimeEntry.job_id == job_id,
-                TimeEntry.labor_activity_id == form.labor_activity_id.data,
-                TimeEntry.date >= week_start,
-                TimeEntry.date <= week_end).options(
-                    db.joinedload(TimeEntry.labor_activity)).all()
+            existing_entries = [entry for entry in all_existing_entries
+                                if entry.labor_activity_id == form.labor_activity_id.data]
 
             if existing_entries:
                 # Create a dictionary to store hours by day index
@@ -1958,20 +1743,8 @@ def foreman_enter_time(job_id, user_id):
                         day_entries[day_index] = entry.hours
 
                 # Map each day to the form field
-                if 0 in day_entries:
-                    form.monday_hours.data = day_entries[0]
-                if 1 in day_entries:
-                    form.tuesday_hours.data = day_entries[1]
-                if 2 in day_entries:
-                    form.wednesday_hours.data = day_entries[2]
-                if 3 in day_entries:
-                    form.thursday_hours.data = day_entries[3]
-                if 4 in day_entries:
-                    form.friday_hours.data = day_entries[4]
-                if 5 in day_entries:
-                    form.saturday_hours.data = day_entries[5]
-                if 6 in day_entries:
-                    form.sunday_hours.data = day_entries[6]
+                for day_index, field in enumerate(day_fields):
+                    field.data = day_entries.get(day_index, 0.0)
 
                 # Populate notes field
                 form.notes.data = existing_entries[0].notes
@@ -1979,13 +1752,9 @@ def foreman_enter_time(job_id, user_id):
             # If no labor activity selected or "ALL" is selected, set default to "ALL"
             form.labor_activity_id.data = 'ALL'
             
-            # For "ALL" view, get all entries but don't populate the form fields
+            # For "ALL" view, use all entries but don't populate the form fields
             # The form will be handled by JavaScript to show totals across all activities
-            existing_entries = TimeEntry.query.filter(
-                TimeEntry.user_id == user_id, TimeEntry.job_id == job_id,
-                TimeEntry.date >= week_start,
-                TimeEntry.date <= week_end).options(
-                    db.joinedload(TimeEntry.labor_activity)).all()
+            existing_entries = all_existing_entries
 
             if existing_entries:
                 # Calculate total hours per day across all activities for "ALL" view
@@ -1998,20 +1767,8 @@ def foreman_enter_time(job_id, user_id):
                         daily_totals[day_index] += entry.hours
 
                 # Map total hours to form fields for "ALL" view
-                if 0 in daily_totals:
-                    form.monday_hours.data = daily_totals[0]
-                if 1 in daily_totals:
-                    form.tuesday_hours.data = daily_totals[1]
-                if 2 in daily_totals:
-                    form.wednesday_hours.data = daily_totals[2]
-                if 3 in daily_totals:
-                    form.thursday_hours.data = daily_totals[3]
-                if 4 in daily_totals:
-                    form.friday_hours.data = daily_totals[4]
-                if 5 in daily_totals:
-                    form.saturday_hours.data = daily_totals[5]
-                if 6 in daily_totals:
-                    form.sunday_hours.data = daily_totals[6]
+                for day_index, field in enumerate(day_fields):
+                    field.data = daily_totals.get(day_index, 0.0)
 
     return render_template('foreman/enter_time.html',
                            form=form,
@@ -2034,9 +1791,6 @@ def approve_timesheet(job_id, user_id):
     Worker submissions (TimeEntry) remain immutable.
     Foreman creates ForemanReviewedTime records with their interpretation.
     """
-    from collections import OrderedDict
-    from decimal import Decimal
-
     # Get the worker and job
     worker = User.query.get_or_404(user_id)
     job = Job.query.get_or_404(job_id)
@@ -2053,34 +1807,20 @@ def approve_timesheet(job_id, user_id):
 
     # Default to current week if no week start provided
     if not form.week_start.data:
-        if url_start_date:
-            try:
-                if '/' in url_start_date:
-                    parsed_date = datetime.strptime(url_start_date, '%m/%d/%Y').date()
-                elif '-' in url_start_date:
-                    parsed_date = datetime.strptime(url_start_date, '%Y-%m-%d').date()
-                else:
-                    parsed_date = None
-
-                if parsed_date:
-                    form.week_start.data = get_week_start(parsed_date)
-                else:
-                    form.week_start.data = get_week_start(date.today())
-            except ValueError:
-                form.week_start.data = get_week_start(date.today())
-        else:
-            form.week_start.data = get_week_start(date.today())
+        parsed_date = parse_flexible_date(url_start_date)
+        form.week_start.data = get_week_start(parsed_date or date.today())
 
     week_start = form.week_start.data
     week_end = week_start + timedelta(days=6)
 
-    # Check if this week is already approved
-    existing_approval = WeeklyApprovalLock.query.filter_by(
-        user_id=user_id, job_id=job_id, week_start=week_start).first()
+    # Check if this week is already approved (always checked fresh before a save)
+    existing_approval = utils.approval_lock_summary(
+        user_id, job_id, week_start, use_cache=request.method == 'GET')
 
     if existing_approval:
+        approver_name, approved_at = existing_approval
         flash(
-            f'This week was already approved by {existing_approval.approver.name} on {existing_approval.approved_at.strftime("%m/%d/%Y %H:%M")}',
+            f'This week was already approved by {approver_name} on {approved_at.strftime("%m/%d/%Y %H:%M")}',
             'warning')
         if current_user.is_admin():
             return redirect(url_for('admin_review_time', start_date=week_start.strftime('%Y-%m-%d')))
@@ -2221,6 +1961,18 @@ def approve_timesheet(job_id, user_id):
                         except (ValueError, TypeError):
                             pass
 
+            # Foreman-originated reviews for this worker's week on any job, loaded once
+            # and keyed by (date, job) for the new-day entries below
+            foreman_entries_by_day_job = {
+                (fe.work_date, fe.job_id): fe
+                for fe in ForemanReviewedTime.query.filter(
+                    ForemanReviewedTime.worker_id == user_id,
+                    ForemanReviewedTime.worker_time_entry_id.is_(None),
+                    ForemanReviewedTime.work_date >= week_start,
+                    ForemanReviewedTime.work_date <= week_end
+                ).options(_unused_relations_load())
+            }
+
             # Process new entries for missing days (foreman-originated)
             # Check each day in the week for new_hours_YYYY-MM-DD fields
             for i in range(7):  # Check all 7 days of the week
@@ -2245,12 +1997,7 @@ def approve_timesheet(job_id, user_id):
                             new_activity_id_int = int(new_activity_id) if new_activity_id else None
 
                             # Check if a foreman-originated review already exists for this date/job
-                            existing_foreman_entry = ForemanReviewedTime.query.filter_by(
-                                worker_id=user_id,
-                                work_date=check_date,
-                                job_id=new_job_id,
-                                worker_time_entry_id=None  # Foreman-originated
-                            ).first()
+                            existing_foreman_entry = foreman_entries_by_day_job.get((check_date, new_job_id))
 
                             if existing_foreman_entry:
                                 # Update existing
@@ -2275,7 +2022,7 @@ def approve_timesheet(job_id, user_id):
                             reviewed_total += float(new_hours)
                             reviewed_count += 1
                     except (ValueError, TypeError) as e:
-                        print(f"DEBUG: Error processing new entry for {date_str}: {e}")
+                        app.logger.debug("Error processing new entry for %s: %s", date_str, e)
                         pass  # Skip invalid entries
 
             # Only create approval lock if finalizing (not saving draft)
@@ -2289,6 +2036,8 @@ def approve_timesheet(job_id, user_id):
                 db.session.add(approval)
 
             db.session.commit()
+            if not is_draft:
+                utils.cache_pop(f'approval_lock:{user_id}:{job_id}:{week_start}')
 
             # Show appropriate message based on action
             if is_draft:
@@ -2317,52 +2066,32 @@ def approve_timesheet(job_id, user_id):
         except Exception as e:
             db.session.rollback()
             flash(f'Error saving reviewed time: {str(e)}', 'danger')
-            print(f"ERROR in approve_timesheet: {str(e)}")
+            app.logger.error("Error in approve_timesheet: %s", e)
+
+    # Build entries data for template with submitted and reviewed values side-by-side,
+    # grouped by date (weekdays always shown, weekend days when they have entries)
+    # with the daily totals accumulated in the same pass
+    entries_by_date = OrderedDict((day, []) for day in sorted(weekdays))
+    submitted_daily_totals = dict.fromkeys(entries_by_date, 0)
+    reviewed_daily_totals = dict.fromkeys(entries_by_date, 0)
 
-    # Build entries data for template with submitted and reviewed values side-by-side
-    entries_data = []
     for entry in submitted_entries:
         existing_review = reviews_by_entry_id.get(entry.id)
-        entries_data.append({
+        reviewed_hours = float(existing_review.reviewed_hours) if existing_review else entry.hours
+        entries_by_date.setdefault(entry.date, []).append({
             'entry': entry,
             'submitted_hours': entry.hours,
             'submitted_job': job,
             'submitted_activity': entry.labor_activity,
             'submitted_notes': entry.notes,
             # Pre-fill reviewed values from existing review or submitted values
-            'reviewed_hours': float(existing_review.reviewed_hours) if existing_review else entry.hours,
+            'reviewed_hours': reviewed_hours,
             'reviewed_job_id': existing_review.job_id if existing_review else job_id,
             'reviewed_activity_id': existing_review.labor_activity_id if existing_review else entry.labor_activity_id,
             'reviewed_notes': existing_review.notes if existing_review else '',
         })
-
-    # Group entries by date for display
-    weekdays_sorted = sorted(weekdays)
-    entries_by_date = OrderedDict()
-
-    for day in weekdays_sorted:
-        entries_by_date[day] = []
-
-    for data in entries_data:
-        entry_date = data['entry'].date
-        if entry_date in entries_by_date:
-            entries_by_date[entry_date].append(data)
-        else:
-            entries_by_date[entry_date] = [data]
-
-    # Add weekend days if they have entries
-    for data in entries_data:
-        entry_date = data['entry'].date
-        if entry_date not in weekdays_sorted and entry_date not in entries_by_date:
-            entries_by_date[entry_date] = [data]
-
-    # Calculate totals
-    submitted_daily_totals = {}
-    reviewed_daily_totals = {}
-
-    for day, day_entries in entries_by_date.items():
-        submitted_daily_totals[day] = sum(d['submitted_hours'] for d in day_entries)
-        reviewed_daily_totals[day] = sum(d['reviewed_hours'] for d in day_entries)
+        submitted_daily_totals[entry.date] = submitted_daily_totals.get(entry.date, 0) + entry.hours
+        reviewed_daily_totals[entry.date] = reviewed_daily_totals.get(entry.date, 0) + reviewed_hours
 
     # Add foreman-originated hours to reviewed totals
     for day, foreman_entries in foreman_originated_by_date.items():
@@ -2406,46 +2135,20 @@ def approve_timesheet(job_id, user_id):
 def admin_review_time():
     """Admin time review page - similar to foreman dashboard but for unassigned jobs"""
     # Get date range parameters from query string
-    start_date_str = request.args.get('start_date')
-    week_offset_str = request.args.get('week_offset', '0')
+    start_date, end_date, week_offset = get_week_range_from_request()
     show_all_jobs = request.args.get('show_all_jobs', 'false').lower() == 'true'
 
-    try:
-        week_offset = int(week_offset_str)
-    except ValueError:
-        week_offset = 0
-
-    # Initialize default values
-    today = date.today()
-    current_monday = get_week_start(today)
-    start_date = current_monday + timedelta(weeks=week_offset)
-    end_date = start_date + timedelta(days=6)
-
-    # If a specific start_date is provided, parse it and override the default
-    if start_date_str:
-        try:
-            if '/' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str, '%m/%d/%Y').date()
-            elif '-' in start_date_str:
-                parsed_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            else:
-                parsed_date = None
-
-            if parsed_date:
-                # Align to Monday and override defaults
-                monday_date = get_week_start(parsed_date)
-                start_date = monday_date
-                end_date = monday_date + timedelta(days=6)
-                print(f"DEBUG: Admin review time - using provided date: {start_date} to {end_date}")
-        except ValueError:
-            # If parsing fails, keep the default values
-            print(f"DEBUG: Admin review time - date parsing failed, using defaults: {start_date} to {end_date}")
-
-    print(f"DEBUG: Admin review time - final date range: {start_date} to {end_date}, week_offset: {week_offset}")
-
-    # Query for time entries within the date range
-    # Use explicit joins to ensure we get the relationships loaded properly
-    entries_query = TimeEntry.query.join(Job, TimeEntry.job_id == Job.id).join(User, TimeEntry.user_id == User.id).filter(
+    app.logger.debug("Admin review time range: %s to %s, week_offset: %s", start_date, end_date, week_offset)
+
+    # Per (job, worker) totals for the week in one grouped query
+    totals_query = db.session.query(
+        TimeEntry.job_id,
+        TimeEntry.user_id,
+        db.func.sum(TimeEntry.hours),
+        db.func.count(db.func.distinct(TimeEntry.date)),
+        # NULL notes are ignored by bool_or, blank ones compare False
+        db.func.bool_or(db.func.trim(TimeEntry.notes) != '')
+    ).filter(
         TimeEntry.date >= start_date,
         TimeEntry.date <= end_date
     )
@@ -2453,99 +2156,53 @@ def admin_review_time():
     # Apply job filter based on toggle
     if not show_all_jobs:
         # Default: Show only unassigned jobs (foreman_id is None)
-        entries_query = entries_query.filter(Job.foreman_id.is_(None))
-        print(f"DEBUG: Admin review time - filtering for unassigned jobs only")
-    else:
-        print(f"DEBUG: Admin review time - showing all jobs")
-
-    # Print the SQL query for debugging
-    print(f"DEBUG: SQL Query: {str(entries_query.statement.compile(compile_kwargs={'literal_binds': True}))}")
-
-    # Get all entries and group by job and user
-    entries = entries_query.order_by(TimeEntry.date, Job.job_code, User.name).all()
-    print(f"DEBUG: Admin review time - found {len(entries)} time entries for date range {start_date} to {end_date}")
-    
-    # Debug: Show first few entries
-    for i, entry in enumerate(entries[:5]):
-        print(f"DEBUG: Entry {i+1}: Job {entry.job.job_code} (foreman_id={entry.job.foreman_id}), Worker {entry.user.name}, Date {entry.date}, Hours {entry.hours}")
-        
-    # Also check what jobs exist in the date range
-    all_jobs_in_range = Job.query.join(TimeEntry, Job.id == TimeEntry.job_id).filter(
-        TimeEntry.date >= start_date,
-        TimeEntry.date <= end_date
-    ).distinct().all()
-    print(f"DEBUG: Jobs with time entries in date range:")
-    for job in all_jobs_in_range:
-        print(f"DEBUG: Job {job.job_code} - foreman_id: {job.foreman_id}")
-
-    # Use the same data structure as foreman dashboard
-    # Get all jobs that have time entries in the date range
-    jobs_with_entries = Job.query.join(TimeEntry, Job.id == TimeEntry.job_id).filter(
-        TimeEntry.date >= start_date,
-        TimeEntry.date <= end_date
-    ).distinct()
-
-    # Apply job filter based on toggle
-    if not show_all_jobs:
-        # Default: Show only unassigned jobs (foreman_id is None)
-        jobs_with_entries = jobs_with_entries.filter(Job.foreman_id.is_(None))
-
-    jobs = jobs_with_entries.all()
+        totals_query = totals_query.join(Job, TimeEntry.job_id == Job.id).filter(Job.foreman_id.is_(None))
+
+    week_totals = {
+        (job_id, user_id): (total_hours or 0, days_with_entries, bool(has_notes))
+        for job_id, user_id, total_hours, days_with_entries, has_notes in totals_query.group_by(
+            TimeEntry.job_id, TimeEntry.user_id)
+    }
+
+    # Jobs that have time entries in the date range, taken from the totals, with
+    # just the columns the job cards use (foreman_id drives the unassigned flag)
+    job_ids = {job_id for job_id, _ in week_totals}
+    jobs = []
+    if job_ids:
+        jobs = Job.query.options(
+            load_only(Job.id, Job.job_code, Job.description, Job.trade_type, Job.foreman_id),
+            db.lazyload(Job.foreman)).filter(Job.id.in_(job_ids)).order_by(Job.job_code).all()
+
+    # Approval locks for the week, loaded once as (worker, job) pairs
+    approved_pairs = set()
+    if job_ids:
+        approved_pairs = {
+            (lock.user_id, lock.job_id)
+            for lock in db.session.query(WeeklyApprovalLock.user_id, WeeklyApprovalLock.job_id).filter(
+                WeeklyApprovalLock.week_start == start_date,
+                WeeklyApprovalLock.job_id.in_(job_ids))
+        }
 
-    # For each job, get all workers with time entries (same structure as foreman dashboard)
+    # Load every worker that appears in the totals at once, then bucket them by job
+    worker_ids = {user_id for _, user_id in week_totals}
+    workers_by_id = {}
+    if worker_ids:
+        workers_by_id = {worker.id: worker for worker in User.query.filter(
+            User.id.in_(worker_ids), User.role == 'worker').all()}
+    workers_by_job = {}
+    for job_id, user_id in week_totals:
+        if user_id in workers_by_id:
+            workers_by_job.setdefault(job_id, []).append(workers_by_id[user_id])
+
+    # For each job, build the worker rows from the grouped totals (same structure as foreman dashboard)
     job_data = []
     for job in jobs:
-        # Get unique workers who submitted time for this job in the date range
-        workers_query = db.session.query(User).join(TimeEntry, User.id == TimeEntry.user_id).\
-            filter(
-                TimeEntry.job_id == job.id,
-                TimeEntry.date >= start_date,
-                TimeEntry.date <= end_date,
-                User.role == 'worker'
-            ).distinct()
-
-        workers = workers_query.all()
-
-        # Get weekly approval status for each worker (same as foreman dashboard)
         workers_data = []
-        for worker in workers:
-            # Check if the week is approved for this worker/job
-            is_approved = WeeklyApprovalLock.query.filter_by(
-                user_id=worker.id, job_id=job.id,
-                week_start=start_date).first() is not None
-
-            # Count total hours for the week
-            total_hours = db.session.query(db.func.sum(TimeEntry.hours)).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date
-                ).scalar() or 0
-
-            # Check if all 7 days of the week have entries
-            days_with_entries = db.session.query(TimeEntry.date).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date
-                ).distinct().count()
-
-            # Check if worker has any entries with notes for this job and week
-            has_notes = db.session.query(TimeEntry).\
-                filter(
-                    TimeEntry.user_id == worker.id,
-                    TimeEntry.job_id == job.id,
-                    TimeEntry.date >= start_date,
-                    TimeEntry.date <= end_date,
-                    TimeEntry.notes.isnot(None),
-                    db.func.trim(TimeEntry.notes) != ''
-                ).first() is not None
-
+        for worker in sorted(workers_by_job.get(job.id, []), key=lambda worker: worker.name):
+            total_hours, days_with_entries, has_notes = week_totals[(job.id, worker.id)]
             workers_data.append({
                 'worker': worker,
-                'is_approved': is_approved,
+                'is_approved': (worker.id, job.id) in approved_pairs,
                 'total_hours': total_hours,
                 'days_with_entries': days_with_entries,
                 'has_all_days': days_with_entries >= 5,  # Standard work week is 5 days
@@ -2580,91 +2237,30 @@ def admin_dashboard():
         WeeklyApprovalLock.approved_at.desc()).limit(10).all()
 
     # Get start_date from URL if provided for week navigation
-    url_start_date = request.args.get('start_date')
-
-    if url_start_date:
-        # Parse the start_date from URL with robust parsing
-        try:
-            # Try both common formats: %m/%d/%Y and %Y-%m-%d
-            if '/' in url_start_date:
-                parsed_date = datetime.strptime(url_start_date,
-                                                '%m/%d/%Y').date()
-            elif '-' in url_start_date:
-                parsed_date = datetime.strptime(url_start_date,
-                                                '%Y-%m-%d').date()
-            else:
-                print(
-                    f"WARNING: Invalid date format in start_date: {url_start_date}"
-                )
-                parsed_date = None
-
-            # Always align to Monday and get the week range
-            if parsed_date:
-                monday_date = get_week_start(parsed_date)
-                start_date = monday_date
-                end_date = monday_date + timedelta(days=6)
-                print(
-                    f"DEBUG: Admin dashboard - using provided date: {start_date} to {end_date}"
-                )
-            else:
-                # Fall back to current week if parse fails
-                start_date, end_date = get_week_range_for_offset(0)
-                print(
-                    f"DEBUG: Admin dashboard - date parse failed, using current week: {start_date} to {end_date}"
-                )
-        except ValueError as e:
-            print(f"ERROR: Date parsing error: {e}")
-            # Fall back to current week
-            start_date, end_date = get_week_range_for_offset(0)
-            print(
-                f"DEBUG: Admin dashboard - date parse error, using current week: {start_date} to {end_date}"
-            )
-    else:
-        # No date provided, use current week
-        start_date, end_date = get_week_range_for_offset(0)
-        print(
-            f"DEBUG: Admin dashboard - calculating for current week: {start_date} to {end_date}"
-        )
-
-    weekly_hours = db.session.query(db.func.sum(TimeEntry.hours)).\
-        filter(
-            TimeEntry.date >= start_date,
-            TimeEntry.date <= end_date
-        ).scalar() or 0
+    start_date, end_date, _ = get_week_range_from_request()
 
-    # Get hours by job for the current week (for chart)
-    job_hours_query = db.session.query(
+    # Hours by job and by trade category for the week (for charts), in one scan of
+    # the week's entries using GROUPING SETS; GROUPING(job_code) is 0 on the job rows
+    hours_rows = db.session.query(
+        db.func.grouping(Job.job_code).label('is_trade_row'),
         Job.job_code,
-        db.func.sum(TimeEntry.hours).label('total_hours')).join(
-            TimeEntry, Job.id == TimeEntry.job_id).filter(
-                TimeEntry.date >= start_date, TimeEntry.date
-                <= end_date).group_by(Job.job_code).all()
-
-    # Convert to JSON-friendly format
-    job_hours = []
-    if job_hours_query:
-        job_labels = [job.job_code for job in job_hours_query]
-        job_values = [float(job.total_hours) for job in job_hours_query]
-        job_hours = list(zip(job_labels, job_values))
-
-    # Get hours by trade category for the current week (for chart)
-    trade_hours_query = db.session.query(
         LaborActivity.trade_category,
         db.func.sum(TimeEntry.hours).label('total_hours')).join(
-            TimeEntry, LaborActivity.id == TimeEntry.labor_activity_id).filter(
+            Job, Job.id == TimeEntry.job_id).join(
+            LaborActivity, LaborActivity.id == TimeEntry.labor_activity_id).filter(
                 TimeEntry.date >= start_date, TimeEntry.date
-                <= end_date).group_by(LaborActivity.trade_category).all()
+                <= end_date).group_by(db.func.grouping_sets(
+                    db.tuple_(Job.job_code),
+                    db.tuple_(LaborActivity.trade_category))).all()
 
     # Convert to JSON-friendly format
-    trade_hours = []
-    if trade_hours_query:
-        trade_labels = [
-            trade.trade_category.capitalize() for trade in trade_hours_query
-        ]
-        trade_values = [
-            float(trade.total_hours) for trade in trade_hours_query
-        ]
-        trade_hours = list(zip(trade_labels, trade_values))
+    job_hours = [(row.job_code, float(row.total_hours))
+                 for row in hours_rows if not row.is_trade_row]
+    trade_hours = [(row.trade_category.capitalize(), float(row.total_hours))
+                   for row in hours_rows if row.is_trade_row]
+
+    # Every entry has a job, so the job rows add up to the week's total
+    weekly_hours = sum(hours for _, hours in job_hours)
 
     return render_template('admin/dashboard.html',
                            active_jobs_count=active_jobs_count,
@@ -2694,15 +2290,16 @@ def get_job_assigned_users(job_id):
     try:
         job = Job.query.get_or_404(job_id)
         
-        # Get assigned users
-        assigned_users = []
-        for user in job.assigned_workers.order_by(User.name):
-            assigned_users.append({
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'role': user.role
-            })
+        # Get assigned users, reading only the columns the response needs
+        rows = db.session.query(User.id, User.name, User.email, User.role).join(
+            job_workers, job_workers.c.user_id == User.id
+        ).filter(
+            job_workers.c.job_id == job_id
+        ).order_by(User.name).all()
+        assigned_users = [
+            {'id': row.id, 'name': row.name, 'email': row.email, 'role': row.role}
+            for row in rows
+        ]
         
         return jsonify({
             'success': True,
@@ -2718,6 +2315,15 @@ def get_job_assigned_users(job_id):
         }), 500
 
 
+def _selected_active_trades(selected_ids):
+    """Active trades for the ids checked in a form checkbox array, in one query.
+    Non-numeric ids are ignored."""
+    trade_ids = [int(trade_id) for trade_id in selected_ids if trade_id.isdigit()]
+    if not trade_ids:
+        return []
+    return Trade.query.filter(Trade.id.in_(trade_ids), Trade.is_active == True).all()
+
+
 @app.route('/admin/jobs', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -2736,8 +2342,12 @@ def manage_jobs():
         # Get status_filter to preserve it across redirects
         status_filter = request.args.get('status_filter', 'active')
 
+        # Trades checked in the form, shared by the edit and create branches
+        selected_trades = _selected_active_trades(selected_trade_ids)
+
         if job_id:
-            job = Job.query.get_or_404(job_id)
+            # Every column is overwritten from the form, so load just the row identity
+            job = Job.query.options(load_only(Job.id), db.lazyload(Job.foreman)).get_or_404(job_id)
             job.job_code = form.job_code.data
             job.description = form.description.data
             job.location = form.location.data
@@ -2749,21 +2359,8 @@ def manage_jobs():
             # Handle foreman assignment
             job.foreman_id = form.foreman_id.data if form.foreman_id.data else None
             
-            # Update job trades (many-to-many)
-            from models import Trade
-            # Clear existing trades properly
-            job.trades = []
-            
-            # Get trades from checkbox array
-            selected_trade_ids = request.form.getlist('trades')
-            for trade_id_str in selected_trade_ids:
-                try:
-                    trade_id = int(trade_id_str)
-                    trade = Trade.query.filter_by(id=trade_id, is_active=True).first()
-                    if trade:
-                        job.trades.append(trade)
-                except (ValueError, TypeError):
-                    continue  # Skip invalid trade IDs
+            # Update job trades (many-to-many) from the checkbox array
+            job.trades = selected_trades
             
             flash('Job updated successfully!', 'success')
         else:
@@ -2775,22 +2372,10 @@ def manage_jobs():
                       longitude=form.longitude.data,
                       status=form.status.data,
                       trade_type=form.trade_type.data,
-                      foreman_id=form.foreman_id.data if form.foreman_id.data else None)
+                      foreman_id=form.foreman_id.data if form.foreman_id.data else None,
+                      # Job trades (many-to-many) from the checkbox array, written with the job
+                      trades=selected_trades)
             db.session.add(job)
-            db.session.flush()  # Get the job ID
-
-            # Add job trades (many-to-many)
-            from models import Trade
-            # Get trades from checkbox array
-            selected_trade_ids = request.form.getlist('trades')
-            for trade_id_str in selected_trade_ids:
-                try:
-                    trade_id = int(trade_id_str)
-                    trade = Trade.query.filter_by(id=trade_id, is_active=True).first()
-                    if trade:
-                        job.trades.append(trade)
-                except (ValueError, TypeError):
-                    continue  # Skip invalid trade IDs
 
             # New jobs start with no workers assigned
             # Workers must be explicitly assigned using the "Assign Workers" button
@@ -2798,6 +2383,7 @@ def manage_jobs():
             flash('New job created successfully!', 'success')
 
         db.session.commit()
+        utils.cache_delete(f'job_trades:{job.id}')
         # Pass the status_filter back to the redirect to maintain the selected filter
         return redirect(url_for('manage_jobs', status_filter=status_filter))
 
@@ -2849,24 +2435,28 @@ def manage_jobs():
 @login_required
 @admin_required
 def delete_job(job_id):
-    job = Job.query.get_or_404(job_id)
+    # Only the code (for the flash messages) and the identity (for the DELETE) are used
+    job = Job.query.options(load_only(Job.id, Job.job_code), db.lazyload(Job.foreman)).get_or_404(job_id)
 
     # Get status_filter to preserve it across redirects
     status_filter = request.args.get('status_filter', 'active')
 
-    # Check if there are any time entries associated with this job
-    time_entries = TimeEntry.query.filter_by(job_id=job_id).count()
+    # Check for time entries or weekly approval locks in one round-trip; EXISTS stops at
+    # the first match, and the counts are only needed for the rejection message
+    has_time_entries, has_approvals = db.session.query(
+        exists().where(TimeEntry.job_id == job_id),
+        exists().where(WeeklyApprovalLock.job_id == job_id)
+    ).one()
 
-    if time_entries > 0:
+    if has_time_entries:
+        time_entries = TimeEntry.query.filter_by(job_id=job_id).count()
         flash(
             f'Cannot delete job "{job.job_code}". It has {time_entries} time entries associated with it. Mark it as "Complete" instead.',
             'danger')
         return redirect(url_for('manage_jobs', status_filter=status_filter))
 
-    # Check if there are any weekly approval locks for this job
-    approvals = WeeklyApprovalLock.query.filter_by(job_id=job_id).count()
-
-    if approvals > 0:
+    if has_approvals:
+        approvals = WeeklyApprovalLock.query.filter_by(job_id=job_id).count()
         flash(
             f'Cannot delete job "{job.job_code}". It has {approvals} weekly approvals associated with it. Mark it as "Complete" instead.',
             'danger')
@@ -2876,6 +2466,7 @@ def delete_job(job_id):
     job_code = job.job_code  # Store for the flash message
     db.session.delete(job)
     db.session.commit()
+    utils.cache_delete(f'job_trades:{job_id}')
 
     flash(f'Job "{job_code}" has been deleted successfully.', 'success')
     return redirect(url_for('manage_jobs', status_filter=status_filter))
@@ -2890,9 +2481,11 @@ def manage_activities():
     trade_form = TradeForm()
     editing_trade = request.args.get('edit_trade')
 
-    # Get active trades for both dropdowns
-    active_trades = Trade.query.filter_by(is_active=True).order_by(
-        Trade.name).all()
+    # Load every trade once: active ones feed both dropdowns and the trade list,
+    # disabled ones get their own display section
+    all_trades = Trade.query.order_by(Trade.name).all()
+    active_trades = [trade for trade in all_trades if trade.is_active]
+    disabled_trades = [trade for trade in all_trades if not trade.is_active]
 
     # 1. Dynamically populate trade_id choices from the database - only active trades
     activity_form.trade_id.choices = [(0, '-- Select Trade --')] + [
@@ -2954,6 +2547,7 @@ def manage_activities():
                 flash('New labor activity created successfully!', 'success')
 
             db.session.commit()
+            utils.cache_delete('labor_activities:')
             return redirect(url_for('manage_activities'))
 
     # Handle trade form submission
@@ -2970,6 +2564,9 @@ def manage_activities():
             flash('New trade created successfully!', 'success')
 
         db.session.commit()
+        utils.cache_delete('labor_activities:')
+        # Trade names are shown in the cached users list
+        utils.cache_delete('users_list:')
         return redirect(url_for('manage_activities'))
 
     # Check if we're editing an activity
@@ -2988,23 +2585,15 @@ def manage_activities():
         trade_form.name.data = trade.name
         trade_form.is_active.data = trade.is_active
 
-    # Get active trades for display
-    active_trades = Trade.query.filter_by(is_active=True).order_by(
-        Trade.name).all()
-
-    # Get disabled trades for a separate display section
-    disabled_trades = Trade.query.filter_by(is_active=False).order_by(
-        Trade.name).all()
-
-    # Get activities grouped by trade category - only active activities
-    activities_by_trade = {}
+    # Get activities grouped by trade category - only active activities. The query is
+    # ordered by category, so each category is one contiguous run
     activities = LaborActivity.query.filter_by(is_active=True).order_by(
         LaborActivity.trade_category, LaborActivity.name).all()
-
-    for activity in activities:
-        if activity.trade_category not in activities_by_trade:
-            activities_by_trade[activity.trade_category] = []
-        activities_by_trade[activity.trade_category].append(activity)
+    activities_by_trade = {
+        trade_category: list(category_activities)
+        for trade_category, category_activities in groupby(
+            activities, key=attrgetter('trade_category'))
+    }
 
     return render_template('admin/activities.html',
                            activity_form=activity_form,
@@ -3029,6 +2618,7 @@ def toggle_trade(id):
             activity.is_active = False
 
     db.session.commit()
+    utils.cache_delete('labor_activities:')
 
     flash(
         f"Trade '{trade.name}' {'enabled' if trade.is_active else 'disabled'} successfully.",
@@ -3043,6 +2633,7 @@ def toggle_activity(id):
     activity = LaborActivity.query.get_or_404(id)
     activity.is_active = not activity.is_active
     db.session.commit()
+    utils.cache_delete('labor_activities:')
 
     flash(
         f"Activity '{activity.name}' {'enabled' if activity.is_active else 'disabled'} successfully.",
@@ -3050,55 +2641,118 @@ def toggle_activity(id):
     return redirect(url_for('manage_activities'))
 
 
+def _list_users(show_inactive, role_filter):
+    """Users for the admin user list as plain dicts, cached briefly between edits"""
+    cache_key = f'users_list:{show_inactive}:{role_filter}'
+    users = utils.cache_get(cache_key)
+    if users is not None:
+        return users
+
+    # Build query with filters
+    users_query = User.query
+
+    # Filter by active status
+    if not show_inactive:
+        users_query = users_query.filter_by(active=True)
+
+    # Filter by role
+    if role_filter == 'worker':
+        users_query = users_query.filter_by(role='worker')
+    elif role_filter == 'foreman':
+        users_query = users_query.filter_by(role='foreman')
+    elif role_filter == 'admin':
+        users_query = users_query.filter_by(role='admin')
+    # For 'all', no role filter is applied
+
+    user_rows = users_query.order_by(User.role, User.name).all()
+
+    # Load qualified trade names for all listed users in one query
+    trades_by_user = {}
+    if user_rows:
+        trade_rows = db.session.query(user_trades.c.user_id, Trade.name).join(
+            Trade, Trade.id == user_trades.c.trade_id).filter(
+                user_trades.c.user_id.in_([user.id for user in user_rows])).order_by(Trade.name)
+        for row in trade_rows:
+            trades_by_user.setdefault(row.user_id, []).append({'name': row.name})
+
+    users = [{
+        'id': user.id,
+        'name': user.name,
+        'email': user.email,
+        'role': user.role,
+        'active': user.active,
+        'use_clock_in': user.use_clock_in,
+        'burden_rate': user.burden_rate,
+        'created_at': user.created_at,
+        'qualified_trades': trades_by_user.get(user.id, [])
+    } for user in user_rows]
+
+    utils.cache_set(cache_key, users, ttl=60)
+    return users
+
+
+def _apply_user_edit(user, form):
+    """Copy a validated UserManagementForm onto an existing user.
+    A blank password keeps the current one."""
+    user.name = form.name.data
+    user.email = form.email.data
+    user.role = form.role.data
+    # Set the use_clock_in field from the form
+    user.use_clock_in = form.use_clock_in.data
+    # Set the burden_rate field from the form
+    user.burden_rate = form.burden_rate.data
+    # Set the active status from the form
+    user.active = form.active.data
+
+    # Update qualified trades (many-to-many) from the checkbox array
+    user.qualified_trades = _selected_active_trades(request.form.getlist('qualified_trades'))
+
+    # Log the change for debugging
+    app.logger.debug(
+        "Updated user %s (ID: %s), use_clock_in set to: %s, burden_rate set to: %s",
+        user.name, user.id, user.use_clock_in, user.burden_rate)
+
+    # Update password if provided
+    if form.password.data:
+        user.set_password(form.password.data)
+
+
 @app.route('/admin/users', methods=['GET', 'POST'])
 @login_required
 @admin_required
 def manage_users():
-    form = UserManagementForm()
+    # Resolve the user being edited once and reuse it for both POST and GET
+    user_id = request.args.get('edit')
+    editing_user = User.query.get_or_404(user_id) if user_id else None
+
+    form = UserManagementForm(is_new_user=editing_user is None)
 
     if form.validate_on_submit():
-        # Check if we're editing an existing user
-        user_id = request.args.get('edit')
-
-        if user_id:
-            user = User.query.get_or_404(user_id)
-            user.name = form.name.data
-            user.email = form.email.data
-            user.role = form.role.data
-            # Set the use_clock_in field from the form
-            user.use_clock_in = form.use_clock_in.data
-            # Set the burden_rate field from the form
-            user.burden_rate = form.burden_rate.data
-            # Set the active status from the form
-            user.active = form.active.data
-
-            # Update qualified trades (many-to-many)
-            from models import Trade
-            # Clear existing trades properly
-            user.qualified_trades = []
-            
-            # Get qualified trades from checkbox array
-            selected_trade_ids = request.form.getlist('qualified_trades')
-            for trade_id_str in selected_trade_ids:
-                try:
-                    trade_id = int(trade_id_str)
-                    trade = Trade.query.filter_by(id=trade_id, is_active=True).first()
-                    if trade:
-                        user.qualified_trades.append(trade)
-                except (ValueError, TypeError):
-                    continue  # Skip invalid trade IDs
-
-            # Log the change for debugging
-            print(
-                f"DEBUG: Updated user {user.name} (ID: {user.id}), use_clock_in set to: {user.use_clock_in}, burden_rate set to: {user.burden_rate}"
-            )
+        # Emails are unique regardless of case: login, password reset and passkey
+        # sign-in all match on lower(email). The form already lowercases the input.
+        email_owner = db.session.query(User.id).filter(func.lower(User.email) == form.email.data)
+        if editing_user:
+            email_owner = email_owner.filter(User.id != editing_user.id)
+        if email_owner.first():
+            flash(f'Another user already uses the email {form.email.data}.', 'danger')
+            if editing_user:
+                return redirect(url_for('manage_users', edit=editing_user.id))
+            return redirect(url_for('manage_users', new='true'))
 
-            # Update password if provided
-            if form.password.data:
-                user.set_password(form.password.data)
+        # Check if we're editing an existing user
+        if editing_user:
+            user = editing_user
+            _apply_user_edit(user, form)
 
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent save took the email first
+                db.session.rollback()
+                flash(f'Another user already uses the email {form.email.data}.', 'danger')
+                return redirect(url_for('manage_users', edit=user_id))
+            utils.cache_delete('users_list:')
             flash('User updated successfully!', 'success')
-            db.session.commit()
         else:
             # This is a new user being created
             user = User(
@@ -3111,42 +2765,23 @@ def manage_users():
             )
 
             # Log the creation for debugging
-            print(
-                f"DEBUG: Creating new user {form.name.data}, use_clock_in set to: {form.use_clock_in.data}, burden_rate set to: {form.burden_rate.data}"
-            )
+            app.logger.debug(
+                "Creating new user %s, use_clock_in set to: %s, burden_rate set to: %s",
+                form.name.data, form.use_clock_in.data, form.burden_rate.data)
 
-            # Set the password
-            if form.password.data:
-                user.set_password(form.password.data)
-            else:
-                # Default password is required
-                flash('Password is required for new users', 'danger')
-                users = User.query.order_by(User.role, User.name).all()
-                return render_template('admin/users.html',
-                                       form=form,
-                                       users=users,
-                                       editing=False,
-                                       new_user=True)
+            # Set the password (required for new users by the form)
+            user.set_password(form.password.data)
 
             # Try to add the new user
             try:
                 db.session.add(user)
                 db.session.flush()  # Get the user ID
                 
-                # Add qualified trades for new user
-                from models import Trade
-                # Get qualified trades from checkbox array
-                selected_trade_ids = request.form.getlist('qualified_trades')
-                for trade_id_str in selected_trade_ids:
-                    try:
-                        trade_id = int(trade_id_str)
-                        trade = Trade.query.filter_by(id=trade_id, is_active=True).first()
-                        if trade:
-                            user.qualified_trades.append(trade)
-                    except (ValueError, TypeError):
-                        continue  # Skip invalid trade IDs
+                # Add qualified trades for new user from the checkbox array
+                user.qualified_trades = _selected_active_trades(request.form.getlist('qualified_trades'))
                 
                 db.session.commit()
+                utils.cache_delete('users_list:')
                 flash('New user added successfully!', 'success')
             except Exception as e:
                 db.session.rollback()
@@ -3155,12 +2790,11 @@ def manage_users():
         return redirect(url_for('manage_users'))
 
     # Check if we're editing a user or if form validation failed
-    user_id = request.args.get('edit')
     new_user = request.args.get('new') == 'true' or (request.method == 'POST' and form.errors)
 
-    if user_id:
+    if editing_user:
         # Editing existing user
-        user = User.query.get_or_404(user_id)
+        user = editing_user
         form.name.data = user.name
         form.email.data = user.email
         form.role.data = user.role
@@ -3169,37 +2803,18 @@ def manage_users():
         form.active.data = user.active  # Load the current active status
         # Load current qualified trades for editing
         form.qualified_trades.data = [trade.id for trade in user.qualified_trades]
-        print(
-            f"DEBUG: Editing user {user.name} (ID: {user.id}), current use_clock_in = {user.use_clock_in}, current burden_rate = {user.burden_rate}"
-        )
+        app.logger.debug(
+            "Editing user %s (ID: %s), current use_clock_in = %s, current burden_rate = %s",
+            user.name, user.id, user.use_clock_in, user.burden_rate)
         editing = True
-        editing_user = user
     else:
         # Not editing (either viewing or adding new)
         editing = False
-        editing_user = None
 
     # Get users for display with optional filtering
     show_inactive = request.args.get('show_inactive') == 'true'
     role_filter = request.args.get('role_filter', 'all')
-
-    # Build query with filters
-    users_query = User.query
-
-    # Filter by active status
-    if not show_inactive:
-        users_query = users_query.filter_by(active=True)
-
-    # Filter by role
-    if role_filter == 'worker':
-        users_query = users_query.filter_by(role='worker')
-    elif role_filter == 'foreman':
-        users_query = users_query.filter_by(role='foreman')
-    elif role_filter == 'admin':
-        users_query = users_query.filter_by(role='admin')
-    # For 'all', no role filter is applied
-
-    users = users_query.order_by(User.role, User.name).all()
+    users = _list_users(show_inactive, role_filter)
 
     return render_template('admin/users.html',
                            form=form,
@@ -3222,8 +2837,12 @@ def get_job_users_api(job_id):
     # Get only active workers and foremen
     all_users = User.query.filter(User.role.in_(['worker', 'foreman']), User.active == True).order_by(User.name).all()
     
-    # Get assigned user IDs
-    assigned_user_ids = [user.id for user in job.assigned_workers.all()]
+    # Get assigned user IDs straight from the association table
+    assigned_user_ids = [
+        user_id for (user_id,) in db.session.query(job_workers.c.user_id).filter(
+            job_workers.c.job_id == job_id
+        ).all()
+    ]
     
     return jsonify({
         'all_users': [
@@ -3253,18 +2872,19 @@ def update_job_user_assignments(job_id):
     selected_user_ids = request.form.getlist('assigned_users')
     selected_user_ids = [int(user_id) for user_id in selected_user_ids if user_id.isdigit()]
     
-    # Clear existing user assignments for this job
-    job.assigned_workers = []
+    # Clear existing user assignments for this job in one statement
+    db.session.execute(job_workers.delete().where(job_workers.c.job_id == job.id))
     
     # Add new user assignments with trade validation
     compatible_users = []
     blocked_users = []
+    assignment_rows = []
     
     if selected_user_ids:
         selected_users = User.query.filter(User.id.in_(selected_user_ids)).all()
         for user in selected_users:
             if utils.is_job_compatible(user, job):
-                job.assigned_workers.append(user)
+                assignment_rows.append({'job_id': job.id, 'user_id': user.id})
                 compatible_users.append(user.name)
             else:
                 # Get trade compatibility info for error message
@@ -3280,6 +2900,8 @@ def update_job_user_assignments(job_id):
                 blocked_users.append(f"{user.name} ({reason})")
     
     try:
+        if assignment_rows:
+            db.session.execute(job_workers.insert(), assignment_rows)
         db.session.commit()
         
         # Provide detailed feedback about assignments
@@ -3299,6 +2921,67 @@ def update_job_user_assignments(job_id):
     return redirect(url_for('manage_jobs'))
 
 
+# Display titles for each report type
+REPORT_TITLES = {
+    'payroll': 'Payroll Report',
+    'job_labor': 'Job Labor Report',
+    'employee_hours': 'Employee Hours Report',
+    'job_cost': 'Job Cost Report',
+    'device_audit': 'Device Audit Log',
+    'job_assignment': 'Job Assignment Report'
+}
+
+# Body text for emailed reports
+REPORT_EMAIL_TEMPLATE = """
+                Please find attached the {title} you requested.
+
+                Date Range: {start} to {end}
+                Report Type: {type_label}
+
+                This is an automated email from BuilderTime Pro.
+                """
+
+
+def _build_report_email_body(report_title, start_date, end_date, report_type_label):
+    """Build the email body sent with a generated report"""
+    return REPORT_EMAIL_TEMPLATE.format(title=report_title,
+                                        start=start_date.strftime('%m/%d/%Y'),
+                                        end=end_date.strftime('%m/%d/%Y'),
+                                        type_label=report_type_label)
+
+
+def _deliver_report(report_data, filename, mimetype, delivery_method, recipient_email,
+                    report_title, report_type, start_date, end_date):
+    """Email a generated report or return it as a download"""
+    if delivery_method == 'email':
+        app.logger.debug("Emailing %s report to: %s", mimetype, recipient_email)
+        email_body = _build_report_email_body(report_title, start_date, end_date,
+                                              REPORT_TITLES.get(report_type, 'Report'))
+        email_sent = utils.send_email_with_attachment(
+            recipient_email=recipient_email,
+            subject=f"BuilderTime Pro: {report_title}",
+            body=email_body,
+            attachment_data=io.BytesIO(report_data),
+            attachment_filename=filename,
+            attachment_mimetype=mimetype)
+
+        if email_sent:
+            flash(f'Report successfully emailed to {recipient_email}',
+                  'success')
+        else:
+            flash(
+                'Failed to send email. Please check SMTP settings or credentials.',
+                'danger')
+
+        return redirect(url_for('generate_reports'))
+
+    # Send the report straight back as an attachment - no temp file needed
+    return send_file(io.BytesIO(report_data),
+                     mimetype=mimetype,
+                     as_attachment=True,
+                     download_name=filename)
+
+
 @app.route('/admin/reports', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -3322,8 +3005,7 @@ def generate_reports():
 
         # Build the base query - different for device audit logs and job assignment
         if report_type == 'device_audit':
-            from models import DeviceLog
-            query = db.session.query(
+            query = select(
                 DeviceLog.ts.label('timestamp'),
                 User.name.label('employee_name'),
                 DeviceLog.action,
@@ -3331,13 +3013,11 @@ def generate_reports():
                 DeviceLog.lat.label('latitude'),
                 DeviceLog.lng.label('longitude'),
                 DeviceLog.ua.label('user_agent')
-            ).join(User, DeviceLog.user_id == User.id).filter(
+            ).join(User, DeviceLog.user_id == User.id).where(
                 DeviceLog.ts >= start_date,
                 DeviceLog.ts <= end_date + timedelta(days=1)  # Include full end date
             )
         elif report_type == 'job_assignment':
-            from sqlalchemy import func
-            # Note: User, Job, Trade already imported at top of file
             # Query for CURRENT job assignments: GROUP BY job with worker summary
 
             # Database-compatible aggregation function
@@ -3349,7 +3029,7 @@ def generate_reports():
                 # SQLite and others: use group_concat
                 worker_agg = func.group_concat(func.distinct(User.name))
 
-            query = db.session.query(
+            query = select(
                 Job.job_code,
                 Job.description.label('job_name'),
                 Job.location,
@@ -3359,7 +3039,7 @@ def generate_reports():
                 job_workers, Job.id == job_workers.c.job_id
             ).join(
                 User, User.id == job_workers.c.user_id
-            ).filter(
+            ).where(
                 Job.status == 'active',  # Only active jobs
                 User.active == True      # Only active users
             ).group_by(
@@ -3390,8 +3070,57 @@ def generate_reports():
                 ]
             # Skip the standard query flow for payroll
             query = None
+        elif report_type == 'job_labor':
+            # Job labor rows repeat the same job, worker and activity many times,
+            # so fetch lean time entry rows and look each related record up once
+            entries_query = select(
+                TimeEntry.date, TimeEntry.hours, TimeEntry.approved,
+                TimeEntry.user_id, TimeEntry.job_id, TimeEntry.labor_activity_id
+            ).where(TimeEntry.date >= start_date, TimeEntry.date <= end_date)
+            if job_id:
+                entries_query = entries_query.where(TimeEntry.job_id == job_id)
+            if user_id:
+                entries_query = entries_query.where(TimeEntry.user_id == user_id)
+            entries = db.session.execute(entries_query).all()
+
+            jobs_by_id = {
+                job.id: job for job in db.session.execute(
+                    select(Job.id, Job.job_code, Job.description).where(
+                        Job.id.in_({entry.job_id for entry in entries})))
+            }
+            worker_names = dict(db.session.execute(
+                select(User.id, User.name).where(
+                    User.id.in_({entry.user_id for entry in entries}))).all())
+            activities_by_id = {
+                activity.id: activity for activity in db.session.execute(
+                    select(LaborActivity.id, LaborActivity.name, LaborActivity.trade_category).where(
+                        LaborActivity.id.in_({entry.labor_activity_id for entry in entries})))
+            }
+
+            data_dicts = []
+            for entry in entries:
+                job = jobs_by_id[entry.job_id]
+                activity = activities_by_id[entry.labor_activity_id]
+                data_dicts.append({
+                    'date': entry.date,
+                    'hours': entry.hours,
+                    'approved': entry.approved,
+                    'worker_name': worker_names[entry.user_id],
+                    'job_code': job.job_code,
+                    'job_description': job.description,
+                    'activity': activity.name,
+                    'trade_category': activity.trade_category
+                })
+            data_dicts.sort(key=lambda row: (row['job_code'], row['date']))
+
+            columns = [
+                'date', 'hours', 'approved', 'worker_name', 'job_code',
+                'job_description', 'activity', 'trade_category'
+            ]
+            # Skip the standard query flow for job labor
+            query = None
         elif report_type == 'job_cost':
-            query = db.session.query(
+            query = select(
                 TimeEntry.id, TimeEntry.date, TimeEntry.hours, TimeEntry.approved,
                 User.name.label('worker_name'), User.burden_rate, Job.job_code,
                 Job.description.label('job_description'),
@@ -3400,10 +3129,10 @@ def generate_reports():
                     User, TimeEntry.user_id == User.id).join(
                         Job, TimeEntry.job_id == Job.id).join(
                             LaborActivity, TimeEntry.labor_activity_id ==
-                            LaborActivity.id).filter(TimeEntry.date >= start_date,
-                                                     TimeEntry.date <= end_date)
+                            LaborActivity.id).where(TimeEntry.date >= start_date,
+                                                    TimeEntry.date <= end_date)
         else:
-            query = db.session.query(
+            query = select(
                 TimeEntry.date, TimeEntry.hours, TimeEntry.approved,
                 User.name.label('worker_name'),
                 Job.job_code, Job.description.label('job_description'),
@@ -3412,44 +3141,42 @@ def generate_reports():
                     User, TimeEntry.user_id == User.id).join(
                         Job, TimeEntry.job_id == Job.id).join(
                             LaborActivity, TimeEntry.labor_activity_id ==
-                            LaborActivity.id).filter(TimeEntry.date >= start_date,
-                                                     TimeEntry.date <= end_date)
+                            LaborActivity.id).where(TimeEntry.date >= start_date,
+                                                    TimeEntry.date <= end_date)
 
-        # Apply filters and execute query (skip for payroll - already handled above)
+        # Apply filters and execute query (skip for payroll and job labor - already handled above)
         if query is not None:
             if report_type == 'device_audit':
                 # For device audit, user_id filter applies to DeviceLog.user_id
                 if user_id:
-                    query = query.filter(DeviceLog.user_id == user_id)
+                    query = query.where(DeviceLog.user_id == user_id)
             elif report_type == 'job_assignment':
                 # For job assignment, only apply job filter - show current assignments
                 if job_id:
-                    query = query.filter(Job.id == job_id)
+                    query = query.where(Job.id == job_id)
                 # No date or user filtering - show all current assignments
             else:
                 # For other reports, apply standard TimeEntry filters
                 if job_id:
-                    query = query.filter(TimeEntry.job_id == job_id)
+                    query = query.where(TimeEntry.job_id == job_id)
 
                 if user_id:
-                    query = query.filter(TimeEntry.user_id == user_id)
+                    query = query.where(TimeEntry.user_id == user_id)
 
             # Order the results
             if report_type == 'device_audit':
                 query = query.order_by(DeviceLog.ts.desc())  # Most recent first
             elif report_type == 'job_assignment':
                 query = query.order_by(Job.job_code)  # Order by job code
-            elif report_type == 'job_labor':
-                query = query.order_by(Job.job_code, TimeEntry.date)
             elif report_type == 'job_cost':
                 query = query.order_by(Job.job_code, User.name, TimeEntry.date)
             else:  # employee_hours
                 query = query.order_by(TimeEntry.date, User.name)
 
-            # Execute the query
-            results = query.all()
+            # Execute the query, fetching rows from the cursor in batches
+            results = db.session.execute(query.execution_options(yield_per=1000))
 
-            # Create pandas dataframe from results
+            # Column order used by the generic CSV/PDF generators
             if report_type == 'device_audit':
                 columns = [
                     'timestamp', 'employee_name', 'action', 'device_id',
@@ -3469,41 +3196,31 @@ def generate_reports():
                     'date', 'hours', 'approved', 'worker_name', 'job_code',
                     'job_description', 'activity', 'trade_category'
                 ]
-            df = pd.DataFrame(results, columns=columns)
+            # Rows are already keyed by their labels - map them straight to dicts
+            data_dicts = [dict(row._mapping) for row in results]
 
             # For job cost reports, add cost calculations
             if report_type == 'job_cost':
-                # Calculate total cost for each row (hours * burden_rate)
-                df['total_cost'] = df.apply(lambda row:
-                    float(row['hours']) * float(row['burden_rate']) if row['burden_rate'] else 0.0, axis=1)
-
-                # Add formatted columns for display
-                df['burden_rate_formatted'] = df['burden_rate'].apply(lambda x: f"${float(x):,.2f}" if x else "N/A")
-                df['total_cost_formatted'] = df['total_cost'].apply(lambda x: f"${x:,.2f}")
-
-            # Convert DataFrame to list of dictionaries for report generation
-            data_dicts = df.to_dict('records')
-        # else: data_dicts already set for payroll report type above
-
-        # Get common info for both formats
-        report_titles = {
-            'payroll': 'Payroll Report',
-            'job_labor': 'Job Labor Report',
-            'employee_hours': 'Employee Hours Report',
-            'job_cost': 'Job Cost Report',
-            'device_audit': 'Device Audit Log',
-            'job_assignment': 'Job Assignment Report'
-        }
+                for row in data_dicts:
+                    # Calculate total cost for each row (hours * burden_rate)
+                    burden_rate = row['burden_rate']
+                    row['total_cost'] = float(row['hours']) * float(burden_rate) if burden_rate else 0.0
+
+                    # Add formatted columns for display
+                    row['burden_rate_formatted'] = f"${float(burden_rate):,.2f}" if burden_rate else "N/A"
+                    row['total_cost_formatted'] = f"${row['total_cost']:,.2f}"
+        # else: data_dicts already set for payroll and job labor report types above
+
         # Create appropriate report title based on report type
         if report_type == 'job_assignment':
-            report_title = f"{report_titles.get(report_type, 'Report')} - Current Assignments"
+            report_title = f"{REPORT_TITLES.get(report_type, 'Report')} - Current Assignments"
         else:
-            report_title = f"{report_titles.get(report_type, 'Report')} ({start_date.strftime('%m/%d/%Y')} to {end_date.strftime('%m/%d/%Y')})"
+            report_title = f"{REPORT_TITLES.get(report_type, 'Report')} ({start_date.strftime('%m/%d/%Y')} to {end_date.strftime('%m/%d/%Y')})"
 
         # Determine file delivery method (download or email)
         delivery_method = form.delivery_method.data
 
-        # Generate report file
+        # Generate report file in the requested format
         if report_format == 'csv':
             # Use specialized CSV generators for specific report types
             if report_type == 'payroll':
@@ -3529,12 +3246,8 @@ def generate_reports():
             
             # If this is a preview request, return formatted HTML
             if is_preview:
-                from flask import Response
-                import csv
-                from io import StringIO
-                
                 # Parse CSV data into rows
-                csv_reader = csv.reader(StringIO(csv_data))
+                csv_reader = csv.reader(io.StringIO(csv_data))
                 rows = list(csv_reader)
                 
                 # Create HTML table with proper formatting
@@ -3597,74 +3310,10 @@ def generate_reports():
                 
                 return Response(html_content, mimetype='text/html')
 
-            # Check if we should email the report
-            if delivery_method == 'email':
-                recipient_email = form.recipient_email.data
-
-                # Create email body
-                email_body = f"""
-                Please find attached the {report_title} you requested.
-
-                Date Range: {start_date.strftime('%m/%d/%Y')} to {end_date.strftime('%m/%d/%Y')}
-                Report Type: {report_titles.get(report_type, 'Report')}
-
-                This is an automated email from BuilderTime Pro.
-                """
-
-                # Send email with CSV attachment
-                email_sent = utils.send_email_with_attachment(
-                    recipient_email=recipient_email,
-                    subject=f"BuilderTime Pro: {report_title}",
-                    body=email_body,
-                    attachment_data=io.BytesIO(csv_data.encode('utf-8')),
-                    attachment_filename=filename,
-                    attachment_mimetype='text/csv')
-
-                if email_sent:
-                    flash(f'Report successfully emailed to {recipient_email}',
-                          'success')
-                else:
-                    flash('Failed to send email. Please check SMTP settings.',
-                          'danger')
-
-                return redirect(url_for('generate_reports'))
-            else:
-                # Use the same file-based approach for CSV files to be consistent
-                # Get the CSV data as bytes
-                csv_bytes = csv_data.encode('utf-8')
-
-                # Generate a unique ID for this report
-                import uuid
-                report_id = str(uuid.uuid4())
-
-                # Create a temp directory if it doesn't exist
-                temp_dir = os.path.join(os.getcwd(), 'temp_reports')
-                if not os.path.exists(temp_dir):
-                    os.makedirs(temp_dir)
-
-                # Save the CSV data to a temporary file
-                temp_file_path = os.path.join(temp_dir, f"{report_id}.csv")
-                with open(temp_file_path, 'wb') as f:
-                    f.write(csv_bytes)
-
-                print(f"DEBUG: Saved CSV to temporary file: {temp_file_path}")
-
-                # Store only file reference in session
-                session['report_id'] = report_id
-                session['report_filename'] = filename
-                session['report_mimetype'] = 'text/csv'
-
-                # Set a flash message
-                flash(
-                    'Report generated successfully. Download will begin shortly.',
-                    'success')
-
-                # Redirect to download endpoint
-                return redirect(url_for('download_report'))
+            report_data = csv_data.encode('utf-8')
+            mimetype = 'text/csv'
         else:  # PDF format
-            print(
-                f"DEBUG: Generating PDF report - format explicitly set to: {report_format}"
-            )
+            app.logger.debug("Generating PDF report - format explicitly set to: %s", report_format)
 
             # Generate PDF report - use specialized functions for different report types
             if report_type == 'job_cost':
@@ -3685,108 +3334,25 @@ def generate_reports():
                 filename = f"device_audit_log_{start_date.strftime('%m%d%Y')}_{end_date.strftime('%m%d%Y')}.pdf"
             else:
                 filename = f"{report_type}_{start_date.strftime('%m%d%Y')}_{end_date.strftime('%m%d%Y')}.pdf"
-            print(f"DEBUG: PDF filename generated: {filename}")
+            app.logger.debug("PDF filename generated: %s", filename)
             
             # If this is a preview request, return the PDF data directly
             if is_preview:
-                from flask import Response
                 # The PDF functions return raw bytes data
                 response = Response(pdf_buffer, mimetype='application/pdf')
                 response.headers['Content-Disposition'] = f'inline; filename="{filename}"'
                 return response
 
-            # Check if we should email the report
-            if delivery_method == 'email':
-                recipient_email = form.recipient_email.data
-                print(f"DEBUG: Emailing PDF report to: {recipient_email}")
-
-                # Create email body
-                email_body = f"""
-                Please find attached the {report_title} you requested.
-
-                Date Range: {start_date.strftime('%m/%d/%Y')} to {end_date.strftime('%m/%d/%Y')}
-                Report Type: {report_titles.get(report_type, 'Report')}
-
-                This is an automated email from BuilderTime Pro.
-                """
-
-                # Send email with PDF attachment - handle bytes vs buffer
-                if isinstance(pdf_buffer, bytes):
-                    attachment_data = io.BytesIO(pdf_buffer)
-                else:
-                    attachment_data = pdf_buffer
-                    
-                email_sent = utils.send_email_with_attachment(
-                    recipient_email=recipient_email,
-                    subject=f"BuilderTime Pro: {report_title}",
-                    body=email_body,
-                    attachment_data=attachment_data,
-                    attachment_filename=filename,
-                    attachment_mimetype='application/pdf')
-
-                if email_sent:
-                    flash(f'Report successfully emailed to {recipient_email}',
-                          'success')
-                else:
-                    flash(
-                        'Failed to send email. Please check SMTP settings or credentials.',
-                        'danger')
-
+            # Handle generators that return a buffer instead of raw bytes
+            report_data = pdf_buffer if isinstance(pdf_buffer, bytes) else pdf_buffer.getvalue()
+            if not report_data:
+                flash('Error: Generated PDF is empty', 'danger')
                 return redirect(url_for('generate_reports'))
-            else:
-                # Get PDF data and validate
-                if isinstance(pdf_buffer, bytes):
-                    pdf_data = pdf_buffer
-                else:
-                    pdf_data = pdf_buffer.getvalue()
-                print(
-                    f"DEBUG: PDF size before storing in session: {len(pdf_data)} bytes"
-                )
-                if not pdf_data:
-                    flash('Error: Generated PDF is empty', 'danger')
-                    return redirect(url_for('generate_reports'))
-
-                print(
-                    f"DEBUG: Verified PDF data exists, proceeding with temporary file storage"
-                )
-
-                # CRITICAL FIX: The PDF is too large for the session cookie (>4KB limit)
-                # Instead of storing binary data in the session, save to a temporary file
-                # and store only the reference in the session
-
-                # Generate a unique ID for this report
-                import uuid
-                report_id = str(uuid.uuid4())
+            mimetype = 'application/pdf'
 
-                # Create a temp directory if it doesn't exist
-                temp_dir = os.path.join(os.getcwd(), 'temp_reports')
-                if not os.path.exists(temp_dir):
-                    os.makedirs(temp_dir)
-
-                # Save the PDF data to a temporary file
-                temp_file_path = os.path.join(temp_dir, f"{report_id}.pdf")
-                with open(temp_file_path, 'wb') as f:
-                    f.write(pdf_data)
-
-                print(f"DEBUG: Saved PDF to temporary file: {temp_file_path}")
-
-                # Store only file reference in session (much smaller)
-                session['report_id'] = report_id
-                session['report_filename'] = filename
-                session['report_mimetype'] = 'application/pdf'
-
-                # Debug log for confirmation
-                print(
-                    f"DEBUG: Stored reference in session, report_id: {report_id}"
-                )
-
-                # Set a flash message
-                flash(
-                    'PDF report generated successfully. Download will begin shortly.',
-                    'success')
-
-                # Redirect to download endpoint
-                return redirect(url_for('download_report'))
+        return _deliver_report(report_data, filename, mimetype, delivery_method,
+                               form.recipient_email.data, report_title, report_type,
+                               start_date, end_date)
 
     # Default dates to current week
     if not form.start_date.data:
@@ -3812,12 +3378,10 @@ def admin_gps_compliance():
         end_date = form.end_date.data
         
         # Convert dates to datetime objects for proper comparison
-        from datetime import datetime, time
         start_datetime = datetime.combine(start_date, time.min)
         end_datetime = datetime.combine(end_date, time.max)
         
         # Query clock sessions where EITHER clock-in OR clock-out is a violation (> 0.5 miles)
-        from sqlalchemy import or_
         clock_sessions = ClockSession.query.filter(
             ClockSession.clock_in >= start_datetime,
             ClockSession.clock_in <= end_datetime,
@@ -4079,10 +3643,13 @@ def admin_gps_compliance():
 @app.route('/api/labor_activities/<int:job_id>')
 @login_required
 def get_labor_activities(job_id):
-    job = Job.query.get_or_404(job_id)
-    
-    # Get job's required trades
-    job_trade_ids = [trade.id for trade in job.trades]
+    # Job trades rarely change - cache them per job to skip the job lookup
+    job_trade_ids = utils.cache_get(f'job_trades:{job_id}')
+    if job_trade_ids is None:
+        job = Job.query.get_or_404(job_id)
+        # Get job's required trades
+        job_trade_ids = [trade.id for trade in job.trades]
+        utils.cache_set(f'job_trades:{job_id}', job_trade_ids)
     
     if not job_trade_ids:
         # No trades assigned to job, return empty list with clear message
@@ -4091,11 +3658,7 @@ def get_labor_activities(job_id):
             'error': 'This job has no trades assigned. Please contact your administrator.'
         })
     
-    # Get enabled activities where activity.trade_id is in job.trades
-    activities_query = LaborActivity.query.filter(
-        LaborActivity.trade_id.in_(job_trade_ids),
-        LaborActivity.is_active == True
-    )
+    allowed_trade_ids = job_trade_ids
     
     # If worker has qualified trades, intersect with those
     if current_user.role == 'worker' and current_user.qualified_trades:
@@ -4109,34 +3672,40 @@ def get_labor_activities(job_id):
                 'activities': [],
                 'error': 'You are not qualified for any trades required by this job. Please contact your administrator.'
             })
-        
-        # Filter activities to only those for trades worker is qualified for
-        activities_query = activities_query.filter(LaborActivity.trade_id.in_(allowed_trade_ids))
-    
-    activities = activities_query.all()
-    
-    # Group activities by trade and sort both trades and activities alphabetically
-    trades_dict = {}
-    for activity in activities:
-        trade_name = activity.trade.name if activity.trade else 'General'
-        if trade_name not in trades_dict:
-            trades_dict[trade_name] = []
-        trades_dict[trade_name].append({
-            'id': activity.id,
-            'name': activity.name
-        })
     
-    # Sort activities alphabetically within each trade
-    for trade_name in trades_dict:
-        trades_dict[trade_name].sort(key=lambda x: x['name'])
-    
-    # Convert to ordered list of trade groups, sorted alphabetically by trade name
-    trade_groups = []
-    for trade_name in sorted(trades_dict.keys()):
-        trade_groups.append({
-            'trade_name': trade_name,
-            'activities': trades_dict[trade_name]
-        })
+    # Activity groups depend only on the allowed trades, so share them across jobs and workers
+    cache_key = 'labor_activities:' + ','.join(str(trade_id) for trade_id in sorted(allowed_trade_ids))
+    trade_groups = utils.cache_get(cache_key)
+    if trade_groups is None:
+        # Get enabled activities for the allowed trades
+        activities = LaborActivity.query.filter(
+            LaborActivity.trade_id.in_(allowed_trade_ids),
+            LaborActivity.is_active == True
+        ).all()
+        
+        # Group activities by trade and sort both trades and activities alphabetically
+        trades_dict = {}
+        for activity in activities:
+            trade_name = activity.trade.name if activity.trade else 'General'
+            if trade_name not in trades_dict:
+                trades_dict[trade_name] = []
+            trades_dict[trade_name].append({
+                'id': activity.id,
+                'name': activity.name
+            })
+        
+        # Sort activities alphabetically within each trade
+        for trade_name in trades_dict:
+            trades_dict[trade_name].sort(key=lambda x: x['name'])
+        
+        # Convert to ordered list of trade groups, sorted alphabetically by trade name
+        trade_groups = []
+        for trade_name in sorted(trades_dict.keys()):
+            trade_groups.append({
+                'trade_name': trade_name,
+                'activities': trades_dict[trade_name]
+            })
+        utils.cache_set(cache_key, trade_groups)
     
     # Return JSON response with activities grouped by trade
     return jsonify({
@@ -4187,24 +3756,10 @@ def admin_settings():
     return render_template('admin/settings.html', system_msg=system_msg)
 
 
-@app.route('/api/time_entries/<date>/<int:job_id>')
+@app.route('/api/time_entries/<isodate:target_date>/<int:job_id>')
 @login_required
-def get_time_entries(date, job_id):
+def get_time_entries(target_date, job_id):
     """API endpoint to get time entries for a specific date and job"""
-    try:
-        # Try to parse the date with both common formats
-        if '/' in date:
-            target_date = datetime.strptime(date, '%m/%d/%Y').date()
-        elif '-' in date:
-            target_date = datetime.strptime(date, '%Y-%m-%d').date()
-        else:
-            print(f"WARNING: Invalid date format in API call: {date}")
-            return jsonify({'error': f'Invalid date format: {date}'}), 400
-    except ValueError as e:
-        print(
-            f"ERROR: Invalid date format in API call: {date}, error: {str(e)}")
-        return jsonify({'error': f'Error parsing date: {str(e)}'}), 400
-
     try:
         entries = TimeEntry.query.filter(TimeEntry.user_id == current_user.id,
                                          TimeEntry.job_id == job_id,
@@ -4218,7 +3773,7 @@ def get_time_entries(date, job_id):
             'notes': entry.notes
         } for entry in entries])
     except Exception as e:
-        print(f"Error loading time entries: {str(e)}")
+        app.logger.error("Error loading time entries: %s", e)
         return jsonify({'error': f'Error loading entries: {str(e)}'}), 500
 
 
@@ -4233,119 +3788,6 @@ def internal_server_error(e):
     return render_template('500.html'), 500
 
 
-@app.route('/download-report')
-@login_required
-def download_report():
-    """Download report endpoint that serves file and redirects back to the reports page"""
-    # We now use only the file reference mode
-    if 'report_id' not in session or 'report_filename' not in session or 'report_mimetype' not in session:
-        flash('No report data found. Please generate a report first.',
-              'warning')
-        return redirect(url_for('generate_reports'))
-
-    # Get filename and mimetype from session
-    filename = session['report_filename']
-    mimetype = session['report_mimetype']
-    report_id = session['report_id']
-
-    # Log what we're doing
-    print(
-        f"DEBUG download_report: Using file reference mode, ID: {report_id}, File: {filename}"
-    )
-
-    # Verify the file exists before proceeding
-    file_ext = 'pdf' if mimetype == 'application/pdf' else 'csv'
-    temp_file_path = os.path.join(os.getcwd(), 'temp_reports',
-                                  f"{report_id}.{file_ext}")
-
-    if not os.path.exists(temp_file_path):
-        flash('Error: Report file not found. Please regenerate the report.',
-              'danger')
-        return redirect(url_for('generate_reports'))
-
-    # Create a template that will auto-download the file and then redirect back
-    return render_template('download.html',
-                           filename=filename,
-                           mimetype=mimetype,
-                           return_url=url_for('generate_reports'))
-
-
-@app.route('/get-report-file')
-@login_required
-def get_report_file():
-    """Actual file download endpoint"""
-    # We now use only file-based storage with report_id for all file types
-    if 'report_id' not in session or 'report_filename' not in session or 'report_mimetype' not in session:
-        flash('No report data found. Please generate a report first.',
-              'warning')
-        return redirect(url_for('generate_reports'))
-
-    # Get information from session
-    report_id = session['report_id']
-    report_filename = session['report_filename']
-    report_mimetype = session['report_mimetype']
-
-    print(
-        f"DEBUG get_report_file: Processing {report_filename}, mimetype {report_mimetype}, ID: {report_id}"
-    )
-
-    try:
-        # Determine file extension and path based on mimetype
-        is_pdf = report_mimetype == 'application/pdf' or report_filename.lower(
-        ).endswith('.pdf')
-        file_ext = 'pdf' if is_pdf else 'csv'
-
-        # Build the path to the temporary file
-        temp_file_path = os.path.join(os.getcwd(), 'temp_reports',
-                                      f"{report_id}.{file_ext}")
-
-        print(f"DEBUG: Reading file from: {temp_file_path}")
-
-        # Check if the file exists
-        if not os.path.exists(temp_file_path):
-            flash(
-                'Error: Report file not found. Please regenerate the report.',
-                'danger')
-            return redirect(url_for('generate_reports'))
-
-        # Send the file directly from disk with appropriate mimetype
-        if is_pdf:
-            print(f"DEBUG: Serving PDF file with strict PDF mimetype")
-
-            # For PDFs, apply special handling with strict headers
-            response = send_file(temp_file_path,
-                                 mimetype='application/pdf',
-                                 as_attachment=True,
-                                 download_name=report_filename)
-
-            # Add headers to ensure browser treats it as a download
-            response.headers[
-                "Content-Disposition"] = f"attachment; filename={report_filename}"
-            response.headers[
-                "Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-        else:
-            # For other formats (CSV, etc.), use standard delivery
-            print(
-                f"DEBUG: Serving file using standard delivery for {report_mimetype}"
-            )
-            response = send_file(temp_file_path,
-                                 mimetype=report_mimetype,
-                                 as_attachment=True,
-                                 download_name=report_filename)
-
-        # Clean up the temp file after sending (optional, can be disabled for debugging)
-        # os.remove(temp_file_path)
-
-        return response
-
-    except Exception as e:
-        print(f"Error sending file: {e}")
-        flash(f'Error downloading file: {str(e)}', 'danger')
-        return redirect(url_for('generate_reports'))
-
-
 @app.route('/debug')
 def debug_route():
     """Debug route to test rendering and basic functionality"""
@@ -4448,11 +3890,13 @@ def passkey_register_finish():
     2. Stores the credential public key and metadata
     3. Returns success or error
     """
-    # Check session for challenge
-    if 'passkey_registration_challenge' not in session:
+    # Take the challenge out of the session; it is single-use either way
+    challenge = session.pop('passkey_registration_challenge', None)
+    challenge_user_id = session.pop('passkey_registration_user_id', None)
+    if challenge is None:
         return jsonify({'error': 'Registration session expired. Please try again.'}), 400
 
-    if session.get('passkey_registration_user_id') != current_user.id:
+    if challenge_user_id != current_user.id:
         return jsonify({'error': 'Invalid session. Please try again.'}), 400
 
     rp_id, expected_origin = get_webauthn_config()
@@ -4464,14 +3908,13 @@ def passkey_register_finish():
         if not credential_data:
             return jsonify({'error': 'No credential data received.'}), 400
 
-        # Debug logging
-        print(f"DEBUG passkey_register_finish: rp_id={rp_id}, expected_origin={expected_origin}")
-        print(f"DEBUG passkey_register_finish: request.host={request.host}, X-Forwarded-Proto={request.headers.get('X-Forwarded-Proto')}")
+        app.logger.debug("passkey_register_finish: rp_id=%s, expected_origin=%s, host=%s, X-Forwarded-Proto=%s",
+                         rp_id, expected_origin, request.host, request.headers.get('X-Forwarded-Proto'))
 
         # Verify the registration response
         verification = verify_registration_response(
             credential=credential_data,
-            expected_challenge=base64url_to_bytes(session['passkey_registration_challenge']),
+            expected_challenge=base64url_to_bytes(challenge),
             expected_rp_id=rp_id,
             expected_origin=expected_origin,
         )
@@ -4498,10 +3941,6 @@ def passkey_register_finish():
         db.session.add(new_credential)
         db.session.commit()
 
-        # Clear the session
-        session.pop('passkey_registration_challenge', None)
-        session.pop('passkey_registration_user_id', None)
-
         return jsonify({
             'success': True,
             'message': 'Passkey registered successfully!',
@@ -4509,7 +3948,7 @@ def passkey_register_finish():
         })
 
     except Exception as e:
-        print(f"Passkey registration error: {e}")
+        app.logger.warning("Passkey registration error: %s", e)
         return jsonify({'error': f'Registration failed: {str(e)}'}), 400
 
 
@@ -4532,7 +3971,7 @@ def passkey_auth_begin():
         return jsonify({'error': 'Email is required.'}), 400
 
     # Find the user
-    user = User.query.filter_by(email=email).first()
+    user = User.query.filter(func.lower(User.email) == email).first()
 
     if not user:
         # Don't reveal if user exists - return generic error
@@ -4597,11 +4036,12 @@ def passkey_auth_finish():
     2. Updates the signature counter
     3. Logs the user in
     """
-    # Check session for challenge
-    if 'passkey_auth_challenge' not in session:
+    # Take the challenge out of the session; it is single-use either way
+    challenge = session.pop('passkey_auth_challenge', None)
+    user_id = session.pop('passkey_auth_user_id', None)
+    if challenge is None:
         return jsonify({'error': 'Authentication session expired. Please try again.'}), 400
 
-    user_id = session.get('passkey_auth_user_id')
     if not user_id:
         return jsonify({'error': 'Invalid session. Please try again.'}), 400
 
@@ -4631,7 +4071,7 @@ def passkey_auth_finish():
         # Verify the authentication response
         verification = verify_authentication_response(
             credential=credential_data,
-            expected_challenge=base64url_to_bytes(session['passkey_auth_challenge']),
+            expected_challenge=base64url_to_bytes(challenge),
             expected_rp_id=rp_id,
             expected_origin=expected_origin,
             credential_public_key=credential.public_key,
@@ -4651,10 +4091,6 @@ def passkey_auth_finish():
 
         login_user(user)
 
-        # Clear session
-        session.pop('passkey_auth_challenge', None)
-        session.pop('passkey_auth_user_id', None)
-
         # Determine redirect URL based on user settings
         if user.use_clock_in:
             redirect_url = url_for('worker_clock')
@@ -4668,7 +4104,7 @@ def passkey_auth_finish():
         })
 
     except Exception as e:
-        print(f"Passkey authentication error: {e}")
+        app.logger.warning("Passkey authentication error: %s", e)
         return jsonify({'error': f'Authentication failed: {str(e)}'}), 400
 
 
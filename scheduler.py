@@ -2,6 +2,7 @@
 Scheduler module for running background tasks.
 Currently implements:
 - Auto clock-out job that runs every minute to close any clock sessions older than 8 hours
+- Device log flush that writes queued device audit rows every few seconds
 """
 import logging
 from datetime import datetime, timedelta
@@ -10,6 +11,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from app import app, db
 from models import ClockSession
+import utils
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -80,6 +82,16 @@ def auto_clock_out_job():
             db.session.rollback()
             logger.error(f"Error in auto_clock_out_job: {str(e)}")
 
+def flush_device_logs_job():
+    """Write any device audit rows queued by the /api/device-log endpoint."""
+    with app.app_context():
+        try:
+            written = utils.flush_device_logs()
+            if written:
+                logger.debug(f"Flushed {written} device log rows")
+        except Exception as e:
+            logger.error(f"Error in flush_device_logs_job: {str(e)}")
+
 def init_scheduler():
     """Initialize and start the background scheduler"""
     scheduler = BackgroundScheduler()
@@ -93,7 +105,17 @@ def init_scheduler():
         replace_existing=True
     )
     
+    # Flush queued device audit logs every few seconds
+    scheduler.add_job(
+        flush_device_logs_job,
+        IntervalTrigger(seconds=5),
+        id='flush_device_logs_job',
+        name='Write queued device audit logs',
+        replace_existing=True,
+        max_instances=1
+    )
+    
     # Start the scheduler
     scheduler.start()
-    logger.info("Background scheduler started with auto clock-out job")
+    logger.info("Background scheduler started with auto clock-out and device log jobs")
     return scheduler
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Tests for the in-process cache size bound."""
+from collections import OrderedDict
+
+import pytest
+
+import cache
+
+
+@pytest.fixture
+def small_cache(monkeypatch):
+    """Run against an empty cache capped at 100 entries."""
+    monkeypatch.setattr(cache, "_CACHE_MAX_ENTRIES", 100)
+    monkeypatch.setattr(cache, "_cache", OrderedDict())
+    return cache._cache
+
+
+class TestCacheBound:
+    """Keys derived from user input must not grow the cache without limit."""
+
+    def test_distinct_failed_login_emails_stay_bounded(self, small_cache):
+        """Counting failures for many different emails never exceeds the bound."""
+        for i in range(1000):
+            cache.cache_incr(f"login:fail:user{i}@example.com", ttl=900)
+
+        assert len(small_cache) == 100
+
+    def test_recently_used_counter_survives_eviction(self, small_cache):
+        """A counter that keeps being hit is not the one evicted."""
+        cache.cache_incr("login:fail:target@example.com", ttl=900)
+        for i in range(1000):
+            cache.cache_incr(f"login:fail:user{i}@example.com", ttl=900)
+            if i % 50 == 0:
+                cache.cache_incr("login:fail:target@example.com", ttl=900)
+
+        assert cache.cache_get("login:fail:target@example.com") == 21
+
+    def test_distinct_approval_weeks_stay_bounded(self, small_cache):
+        """Caching approval lookups for arbitrary query-string weeks never exceeds the bound."""
+        for year in range(1, 1001):
+            cache.cache_set(f"approval_lock:1:1:{year:04d}-01-01", False, ttl=60)
+
+        assert len(small_cache) == 100
+        assert cache.cache_get("approval_lock:1:1:1000-01-01") is False
@@ -0,0 +1,67 @@
+"""Tests for the password rules in the admin user management form."""
+import pytest
+
+from app import app
+from forms import UserManagementForm
+from models import User
+import routes
+
+
+# A foreman needs no burden rate, so only the password fields decide validity
+USER_FORM_DATA = {
+    "name": "Test Foreman",
+    "email": "test.foreman@example.com",
+    "role": "foreman",
+    "password": "",
+    "confirm_password": "",
+}
+
+
+@pytest.fixture
+def no_csrf(monkeypatch):
+    """Validate forms without a CSRF token."""
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+
+
+@pytest.fixture
+def set_password_calls(monkeypatch):
+    """Record set_password calls instead of hashing."""
+    calls = []
+    monkeypatch.setattr(User, "set_password", lambda self, password: calls.append(password))
+    return calls
+
+
+class TestUserManagementFormPassword:
+    """New users need a password; edits may leave it blank."""
+
+    def test_new_user_without_password_fails_validation(self, no_csrf):
+        """Creating a user with an empty password is rejected."""
+        with app.test_request_context("/admin/users", method="POST", data=USER_FORM_DATA):
+            form = UserManagementForm(is_new_user=True)
+
+            assert not form.validate()
+            assert "Password is required for new users" in form.password.errors
+
+    def test_edit_with_blank_password_keeps_current_password(self, no_csrf, set_password_calls):
+        """Saving an edit with a blank password never calls set_password."""
+        with app.test_request_context("/admin/users?edit=1", method="POST", data=USER_FORM_DATA):
+            form = UserManagementForm(is_new_user=False)
+            assert form.validate(), form.errors
+
+            user = User(name="Old Name", email="old@example.com", role="worker")
+            routes._apply_user_edit(user, form)
+
+        assert set_password_calls == []
+        assert user.name == "Test Foreman"
+
+    def test_edit_with_new_password_sets_it(self, no_csrf, set_password_calls):
+        """Saving an edit with a new password passes it to set_password."""
+        data = {**USER_FORM_DATA, "password": "new-secret", "confirm_password": "new-secret"}
+        with app.test_request_context("/admin/users?edit=1", method="POST", data=data):
+            form = UserManagementForm(is_new_user=False)
+            assert form.validate(), form.errors
+
+            user = User(name="Old Name", email="old@example.com", role="worker")
+            routes._apply_user_edit(user, form)
+
+        assert set_password_calls == ["new-secret"]
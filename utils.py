@@ -1,13 +1,19 @@
 from datetime import datetime, timedelta, date
 import csv
 import io
+import logging
 import math
+import queue
 from flask import url_for
-from models import TimeEntry, User, Job, LaborActivity, WeeklyApprovalLock, ForemanReviewedTime
+from cache import cache_get, cache_set, cache_delete, cache_pop, cache_incr
+from models import TimeEntry, User, Job, LaborActivity, WeeklyApprovalLock, ForemanReviewedTime, DeviceLog
 from app import db
 from sqlalchemy import literal, union_all, case
+from sqlalchemy.exc import DataError, IntegrityError
 from decimal import Decimal
 
+logger = logging.getLogger(__name__)
+
 
 def get_effective_time_query(start_date, end_date, job_id=None, user_id=None, reviewed_only=False):
     """
@@ -149,6 +155,8 @@ def get_effective_time_query(start_date, end_date, job_id=None, user_id=None, re
 
     return all_results
 
+EARTH_RADIUS_M = 6371000  # Mean radius of the earth in meters
+
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the great circle distance between two points 
@@ -156,15 +164,14 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     Returns distance in meters.
     """
     # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlon = lon2 - lon1
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
     dlat = lat2 - lat1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    r = 6371000  # Radius of earth in meters
-    return c * r
+    dlon = math.radians(lon2 - lon1)
+
+    # Haversine formula
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
 
 def get_week_start(target_date):
     """Return the Monday of the week containing the target date."""
@@ -178,11 +185,33 @@ def get_week_range(target_date):
 
 def is_timesheet_approved(user_id, job_id, week_start):
     """Check if a timesheet is approved for a given user, job, and week."""
-    return WeeklyApprovalLock.query.filter_by(
+    # EXISTS avoids loading the lock row and its eagerly joined worker/approver users
+    return db.session.query(WeeklyApprovalLock.query.filter_by(
         user_id=user_id,
         job_id=job_id,
         week_start=week_start
-    ).first() is not None
+    ).exists()).scalar()
+
+def approval_lock_summary(user_id, job_id, week_start, use_cache=True):
+    """(approver name, approved_at) if the week is approved for the user and job, else None.
+
+    Results are cached for a minute under approval_lock:; approve_timesheet drops
+    the key when it creates a lock. Pass use_cache=False before writing time.
+    week_start comes from the query string, so any date can make a new key; the
+    cache's size bound keeps those from piling up.
+    """
+    cache_key = f'approval_lock:{user_id}:{job_id}:{week_start}'
+    summary = cache_get(cache_key) if use_cache else None
+    if summary is None:
+        summary = db.session.query(User.name, WeeklyApprovalLock.approved_at).join(
+            User, User.id == WeeklyApprovalLock.approved_by).filter(
+                WeeklyApprovalLock.user_id == user_id,
+                WeeklyApprovalLock.job_id == job_id,
+                WeeklyApprovalLock.week_start == week_start).first()
+        # Store "not approved" as False so it is cached too
+        summary = tuple(summary) if summary else False
+        cache_set(cache_key, summary, ttl=60)
+    return summary or None
 
 def get_weekly_totals(user_id, start_date, end_date=None):
     """Get total hours for a user for a given week."""
@@ -647,18 +676,12 @@ def generate_pdf_report(data, columns, title="Report"):
     doc.build(elements, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
     buffer.seek(0)
     
-    # Get PDF size and log it
-    pdf_size = len(buffer.getvalue())
-    print(f"DEBUG: Generated PDF size: {pdf_size} bytes")
-    
-    # Create a new buffer with the content
     pdf_data = buffer.getvalue()
     buffer.close()
-    
-    # Debug help - log the type and size before return
-    print(f"DEBUG: PDF data type: {type(pdf_data)}, size: {len(pdf_data)} bytes")
+
+    logger.debug("Generated PDF size: %d bytes", len(pdf_data))
     if len(pdf_data) == 0:
-        print("ERROR: Generated PDF is empty!")
+        logger.error("Generated PDF is empty!")
     
     return pdf_data
 
@@ -1115,7 +1138,7 @@ def send_email_with_attachment(recipient_email, subject, body, attachment_data=N
 
     # Validate required credentials
     if not smtp_username or not smtp_password:
-        print("Error: SMTP credentials not configured. Set SMTP_USERNAME and SMTP_PASSWORD environment variables.")
+        logger.error("SMTP credentials not configured. Set SMTP_USERNAME and SMTP_PASSWORD environment variables.")
         return False
 
     # Create the email message
@@ -1142,30 +1165,30 @@ def send_email_with_attachment(recipient_email, subject, body, attachment_data=N
 
     try:
         # Connect to the SMTP server
-        print(f"Connecting to {smtp_server}:{smtp_port}...")
+        logger.debug("Connecting to %s:%s...", smtp_server, smtp_port)
         server = smtplib.SMTP(smtp_server, smtp_port)
         
-        print("Starting TLS...")
+        logger.debug("Starting TLS...")
         server.starttls()  # Secure the connection
         
-        print(f"Logging in as {smtp_username}...")
+        logger.debug("Logging in as %s...", smtp_username)
         server.login(smtp_username, smtp_password)
 
         # Send the email
-        print(f"Sending email to {recipient_email}...")
+        logger.debug("Sending email to %s...", recipient_email)
         server.send_message(msg)
         server.quit()
-        print("Email sent successfully!")
+        logger.info("Email sent to %s", recipient_email)
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending email: %s", e)
         # Add specific error handling for common SMTP errors
         if "authentication failed" in str(e).lower():
-            print("Authentication failed. Please check your SMTP_USERNAME and SMTP_PASSWORD.")
+            logger.error("Authentication failed. Please check your SMTP_USERNAME and SMTP_PASSWORD.")
         elif "connection refused" in str(e).lower():
-            print(f"Connection to {smtp_server}:{smtp_port} refused. Please check your SMTP_SERVER and SMTP_PORT.")
+            logger.error("Connection to %s:%s refused. Please check your SMTP_SERVER and SMTP_PORT.", smtp_server, smtp_port)
         elif "timeout" in str(e).lower():
-            print(f"Connection to {smtp_server}:{smtp_port} timed out. Please check your network settings.")
+            logger.error("Connection to %s:%s timed out. Please check your network settings.", smtp_server, smtp_port)
         return False
 
 def format_date(date_obj):
@@ -1237,11 +1260,11 @@ def geocode_address(address):
                     'display_name': result.get('display_name', address)
                 }
             else:
-                print(f"No geocoding results found for address: {address}")
+                logger.info("No geocoding results found for address: %s", address)
                 return None
     
     except Exception as e:
-        print(f"Error geocoding address '{address}': {str(e)}")
+        logger.warning("Error geocoding address %r: %s", address, e)
         return None
 
 def generate_device_audit_csv(data, title="Device Audit Log"):
@@ -1488,4 +1511,110 @@ def get_compatible_activities(user, job):
 def is_job_compatible(user, job):
     """Check if user can work on job (has compatible trade + available activities)"""
     compatible_activities = get_compatible_activities(user, job)
-    return len(compatible_activities) > 0
\ No newline at end of file
+    return len(compatible_activities) > 0
+
+
+def labor_activity_choices(trade_type=None):
+    """SelectField choices for labor activities, optionally limited to one trade category.
+
+    Cached under the labor_activities: prefix so the admin routes that already
+    clear that prefix also invalidate these lists.
+    """
+    cache_key = f'labor_activities:choices:{trade_type}'
+    choices = cache_get(cache_key)
+    if choices is None:
+        query = LaborActivity.query
+        if trade_type:
+            query = query.filter_by(trade_category=trade_type)
+        choices = [(activity.id, activity.name) for activity in query.all()]
+        cache_set(cache_key, choices, ttl=300)
+    return choices
+
+
+def general_work_activity_id(trade_type):
+    """Id of the 'General Work' labor activity for a trade category, or None.
+
+    Cached under the labor_activities: prefix, so edits on the activity admin
+    pages invalidate it.
+    """
+    cache_key = f'labor_activities:general_work:{trade_type}'
+    activity_id = cache_get(cache_key)
+    if activity_id is None:
+        activity_id = db.session.query(LaborActivity.id).filter_by(
+            name='General Work', trade_category=trade_type).limit(1).scalar()
+        if activity_id is not None:
+            cache_set(cache_key, activity_id, ttl=300)
+    return activity_id
+
+
+# Buffered device audit log
+# Clock pages post a device log entry per action; the rows are queued here and
+# written in batches by the background scheduler so the request never waits on
+# a commit. Rows still queued when the process dies are lost, which is
+# acceptable; a failed write puts its rows back on the queue instead.
+_device_log_queue = queue.Queue()
+DEVICE_LOG_BATCH_SIZE = 500
+
+
+def queue_device_log(**row):
+    """Queue a DeviceLog row (column name -> value) for the next flush"""
+    row.setdefault('ts', datetime.utcnow())
+    _device_log_queue.put(row)
+
+
+def _requeue_device_logs(rows):
+    """Put rows back on the queue so the next flush retries them"""
+    for row in rows:
+        _device_log_queue.put(row)
+
+
+def _insert_device_logs_one_by_one(rows):
+    """Insert rows individually after a batch was rejected for bad data.
+
+    Rows the database rejects on their own are logged and dropped; any other
+    error requeues the remaining rows and is re-raised. Returns the rows written.
+    """
+    written = 0
+    for index, row in enumerate(rows):
+        try:
+            db.session.execute(DeviceLog.__table__.insert(), [row])
+            db.session.commit()
+            written += 1
+        except (DataError, IntegrityError):
+            db.session.rollback()
+            logger.warning("Dropping device log row the database rejected: %s", row, exc_info=True)
+        except Exception:
+            db.session.rollback()
+            _requeue_device_logs(rows[index:])
+            raise
+    return written
+
+
+def flush_device_logs():
+    """Insert queued DeviceLog rows in batches. Needs an app context.
+
+    A batch that fails is put back on the queue for the next run, except that a
+    batch rejected for bad data is retried row by row so one bad row does not
+    drop the others. Returns the number of rows written.
+    """
+    written = 0
+    while True:
+        rows = []
+        while len(rows) < DEVICE_LOG_BATCH_SIZE:
+            try:
+                rows.append(_device_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return written
+        try:
+            db.session.execute(DeviceLog.__table__.insert(), rows)
+            db.session.commit()
+            written += len(rows)
+        except (DataError, IntegrityError):
+            db.session.rollback()
+            written += _insert_device_logs_one_by_one(rows)
+        except Exception:
+            db.session.rollback()
+            _requeue_device_logs(rows)
+            raise